@@ -1,18 +1,23 @@
 import logging
+import time
 
 import click
 import mongoengine
 from rdflib import Graph
 
-from udata.commands import cli, cyan, echo, green, magenta, yellow
+from udata.commands import cli, cyan, echo, green, magenta, success, yellow
+from udata.core.dataservices.models import Dataservice
 from udata.core.dataset.factories import DatasetFactory
+from udata.core.dataset.models import Dataset
 from udata.core.dataset.rdf import dataset_from_rdf
+from udata.core.site.models import current_site
+from udata.core.site.rdf import iter_catalog
 from udata.harvest.backends.dcat import (
     CswDcatBackend,
     CswIso19139DcatBackend,
     DcatBackend,
 )
-from udata.rdf import namespace_manager
+from udata.rdf import namespace_manager, stream_graphs
 
 log = logging.getLogger(__name__)
 
@@ -96,3 +101,22 @@ def parse_url(url, csw, iso, quiet=False, rid=""):
             else:
                 echo(green("Dataset is valid ✅"))
             echo("")
+
+
+@grp.command()
+@click.argument("output", type=click.File("w", encoding="utf8"))
+@click.option(
+    "-f",
+    "--format",
+    default="nt",
+    type=click.Choice(["nt", "ttl", "json"]),
+    help="The serialization format (N-Triples, Turtle or JSON-LD)",
+)
+def dump(output, format):
+    """Dump the whole site DCAT catalog into OUTPUT, dataset by dataset"""
+    start = time.time()
+    datasets = Dataset.objects.visible().timeout(False)
+    dataservices = Dataservice.objects.visible().timeout(False)
+    for chunk in stream_graphs(iter_catalog(current_site, datasets, dataservices), format):
+        output.write(chunk)
+    success("Catalog dumped into {0} in {1:.1f}s".format(output.name, time.time() - start))
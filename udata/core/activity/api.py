@@ -1,7 +1,6 @@
 import logging
 
 from bson import ObjectId
-from mongoengine.errors import DoesNotExist
 
 from udata.api import API, api, fields
 from udata.core.organization.api_fields import org_ref_fields
@@ -95,18 +94,8 @@ class SiteActivityAPI(API):
         qs = qs.order_by("-created_at")
         qs = qs.paginate(args["page"], args["page_size"])
 
-        # Filter out DBRefs
-        # Always return a result even not complete
-        # But log the error (ie. visible in sentry, silent for user)
-        # Can happen when someone manually delete an object in DB (ie. without proper purge)
-        safe_items = []
-        for item in qs.queryset.items:
-            try:
-                item.related_to
-            except DoesNotExist as e:
-                log.error(e, exc_info=True)
-            else:
-                safe_items.append(item)
-        qs.queryset.items = safe_items
+        # Fetch targets, actors and organizations with one query per collection
+        # and filter out dangling references
+        qs.dereference()
 
         return qs
@@ -1,5 +1,6 @@
 from datetime import datetime
 
+from bson import ObjectId
 from flask import url_for
 from mongoengine import Q
 
@@ -32,8 +33,8 @@ class DataserviceQuerySet(OwnedQuerySet):
     def hidden(self):
         return self(db.Q(private=True) | db.Q(deleted_at__ne=None) | db.Q(archived_at__ne=None))
 
-    def filter_by_dataset_pagination(self, datasets: list[Dataset], page: int):
-        """Paginate the dataservices on the datasets provided.
+    def filter_by_dataset_pagination(self, datasets: list[Dataset | ObjectId], page: int):
+        """Paginate the dataservices on the datasets (or datasets ids) provided.
 
         This is a workaround, used (at least) in the catalogs for sites and organizations.
         We paginate those kinda weirdly, on their datasets. So a given organization or site
@@ -60,7 +61,7 @@ class DataserviceQuerySet(OwnedQuerySet):
         # Another option is to do some tricky Mongo requests to order/group datasets by their presence in some dataservices but
         # it could be really hard to do with a n..n relation.
         # Let's keep this solution simple right now and iterate on it in the future.
-        dataservices_filter = Q(datasets__in=[d.id for d in datasets])
+        dataservices_filter = Q(datasets__in=[getattr(d, "id", d) for d in datasets])
 
         # On the first page, add all dataservices without datasets
         if page == 1:
@@ -103,6 +104,7 @@ class Dataservice(WithMetrics, Owned, db.Document):
     meta = {
         "indexes": [
             "$title",
+            "harvest.remote_id",
         ]
         + Owned.meta["indexes"],
         "queryset_class": DataserviceQuerySet,
@@ -5,7 +5,7 @@ from flask_restx.inputs import boolean
 
 from udata.api import api
 from udata.api.parsers import ModelApiParser
-from udata.models import Dataservice, Organization, User
+from udata.models import Dataservice, Organization
 from udata.search import (
     BoolFilter,
     Filter,
@@ -13,6 +13,7 @@ from udata.search import (
     ModelTermsFilter,
     register,
 )
+from udata.search.adapter import reference_id
 from udata.utils import to_iso_datetime
 
 __all__ = ("DataserviceSearch",)
@@ -84,18 +85,27 @@ class DataserviceSearch(ModelSearchAdapter):
 
     @classmethod
     def serialize(cls, dataservice: Dataservice) -> dict:
+        return cls.serialize_many([dataservice])[0]
+
+    @classmethod
+    def serialize_many(cls, dataservices: list[Dataservice]) -> list[dict]:
+        organizations, owners = cls.fetch_owners(dataservices)
+        return [cls._serialize(dataservice, organizations, owners) for dataservice in dataservices]
+
+    @classmethod
+    def _serialize(cls, dataservice: Dataservice, organizations: dict, owners: dict) -> dict:
         organization = None
         owner = None
-        if dataservice.organization:
-            org = Organization.objects(id=dataservice.organization.id).first()
+        if org_id := reference_id(dataservice, "organization"):
+            org = organizations.get(org_id)
             organization = {
                 "id": str(org.id),
                 "name": org.name,
                 "public_service": 1 if org.public_service else 0,
                 "followers": org.metrics.get("followers", 0),
             }
-        elif dataservice.owner:
-            owner = User.objects(id=dataservice.owner.id).first()
+        elif owner_id := reference_id(dataservice, "owner"):
+            owner = owners.get(owner_id)
         extras = {}
         for key, value in dataservice.extras.items():
             extras[key] = to_iso_datetime(value) if isinstance(value, datetime.datetime) else value
@@ -86,6 +86,7 @@ class DatasetApiParser(ModelApiParser):
         "reuses": "metrics.reuses",
         "followers": "metrics.followers",
         "views": "metrics.views",
+        "quality": "quality_cached.score",
     }
 
     def __init__(self):
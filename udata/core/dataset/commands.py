@@ -10,7 +10,7 @@ from udata.core.dataset.constants import DEFAULT_LICENSE
 from udata.models import Dataset, License
 
 from . import actions
-from .tasks import send_frequency_reminder
+from .tasks import send_frequency_reminder, update_datasets_quality
 
 log = logging.getLogger(__name__)
 
@@ -117,3 +117,10 @@ def archive(filepath, comment):
                 actions.archive(dataset, comment)
                 count += 1
     log.info("Archived %s datasets, %s failed", count, errors)
+
+
+@grp.command()
+def quality():
+    """Recompute the stored quality of every dataset"""
+    update_datasets_quality()
+    success("Done")
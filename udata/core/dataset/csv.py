@@ -47,6 +47,18 @@ class DatasetCsvAdapter(csv.Adapter):
         ("quality_score", lambda o: format(o.quality["score"], ".2f")),
         # schema? what is the schema of a dataset?
     )
+    # Dataset fields read by the callable getters and properties above
+    extra_projection = (
+        "created_at_internal",
+        "last_modified_internal",
+        "featured",
+        "tags",
+        "archived",
+        "resources",
+        "harvest",
+        "quality_cached",
+        "metrics",
+    )
 
     def dynamic_fields(self):
         return csv.metric_fields(Dataset)
@@ -93,3 +105,5 @@ class ResourcesCsvAdapter(csv.NestedAdapter):
         ("preview_url", lambda o: o.preview_url or False),
     )
     attribute = "resources"
+    # Dataset fields read by the callable getters and properties above
+    extra_projection = ("organization", "archived")
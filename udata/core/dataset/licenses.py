@@ -0,0 +1,122 @@
+"""
+In-memory license index used by `License.guess`.
+
+Exact matches are resolved with dictionaries and fuzzy matches only compare strings
+whose length is close enough to be within `MAX_DISTANCE` of the guessed text,
+so guessing a license neither queries the database nor scans every license.
+"""
+
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from stringdist import rdlevenshtein
+
+from udata.uris import ValidationError
+from udata.uris import validate as validate_url
+
+from .constants import MAX_DISTANCE
+
+
+class FuzzyIndex(object):
+    """Strings bucketed by length, each associated to a value"""
+
+    def __init__(self):
+        self.buckets = defaultdict(list)
+
+    def add(self, string, value):
+        self.buckets[len(string)].append((string, value))
+
+    def matches(self, string):
+        """
+        Values of the indexed strings within `MAX_DISTANCE` of `string`.
+
+        The Damerau-Levenshtein distance is at least the length difference
+        so strings from other buckets can't match.
+        """
+        for length in range(len(string) - MAX_DISTANCE, len(string) + MAX_DISTANCE + 1):
+            for candidate, value in self.buckets.get(length, ()):
+                if rdlevenshtein(candidate, string) <= MAX_DISTANCE:
+                    yield value
+
+
+class LicenseIndex(object):
+    """
+    Index of licenses matching the same way as the former database queries.
+
+    `slugify` is the function normalizing license slugs,
+    licenses are expected in their database natural order.
+    """
+
+    def __init__(self, licenses, slugify):
+        self.licenses = list(licenses)
+        self.ids = {}
+        self.slugs = {}
+        self.urls = {}
+        self.titles = FuzzyIndex()
+        self.fuzzy_slugs = FuzzyIndex()
+        self.alternate_titles = FuzzyIndex()
+        for position, license in enumerate(self.licenses):
+            # Keep the first license in natural order for each key like `.first()` does
+            self.ids.setdefault(license.id.lower(), position)
+            self.slugs.setdefault(license.slug, position)
+            for url in filter(None, [license.url, *license.alternate_urls]):
+                self.urls.setdefault(url.lower(), position)
+            self.fuzzy_slugs.add(license.slug, license)
+            self.titles.add(license.title.lower(), license)
+            for title in license.alternate_titles:
+                self.alternate_titles.add(slugify(title), license)
+
+    def exact(self, text, slug):
+        positions = [
+            position
+            for position in (self.ids.get(text), self.slugs.get(slug), self.urls.get(text))
+            if position is not None
+        ]
+        if positions:
+            return self.licenses[min(positions)]
+
+    def url(self, text):
+        """Match an URL ignoring its scheme and trailing slash"""
+        try:
+            url = validate_url(text)
+        except ValidationError:
+            return
+        parsed = urlparse(url)
+        path = parsed.path.rstrip("/")
+        query = f"{parsed.netloc}{path}"
+        for license in self.licenses:
+            if query in (license.url or "").lower() or any(
+                query in url for url in license.alternate_urls
+            ):
+                return license
+
+    def guess(self, text, slug):
+        """
+        Guess a license from a lower cased and stripped `text` and its `slug`.
+
+        Try to exact match on identifier, slug or URLs then on a similar URL
+        and fallback on a single match with a low edit distance
+        on the slug, the title or the alternate titles.
+        """
+        license = self.exact(text, slug)
+        if license is None:
+            license = self.url(text)
+        if license is None:
+            license = single(self.fuzzy_slugs.matches(slug))
+        if license is None:
+            license = single(self.titles.matches(text))
+        if license is None:
+            license = single(set(self.alternate_titles.matches(slug)))
+        return license
+
+
+def single(candidates):
+    """
+    The only candidate if there is exactly one.
+
+    If there is more that one match, we cannot determinate
+    which one is closer to safely choose between candidates.
+    """
+    candidates = list(candidates)
+    if len(candidates) == 1:
+        return candidates[0]
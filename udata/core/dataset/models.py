@@ -1,8 +1,8 @@
 import logging
 import re
+import time
 from datetime import datetime, timedelta
 from pydoc import locate
-from urllib.parse import urlparse
 
 import requests
 from blinker import signal
@@ -11,8 +11,7 @@ from flask import current_app
 from mongoengine import DynamicEmbeddedDocument
 from mongoengine import ValidationError as MongoEngineValidationError
 from mongoengine.fields import DateTimeField
-from mongoengine.signals import post_save, pre_save
-from stringdist import rdlevenshtein
+from mongoengine.signals import post_delete, post_save, pre_save
 from werkzeug.utils import cached_property
 
 from udata.api_fields import field
@@ -24,8 +23,7 @@ from udata.i18n import lazy_gettext as _
 from udata.mail import get_mail_campaign_dict
 from udata.models import Badge, BadgeMixin, BadgesList, SpatialCoverage, WithMetrics, db
 from udata.mongo.errors import FieldValidationError
-from udata.uris import ValidationError, endpoint_for
-from udata.uris import validate as validate_url
+from udata.uris import endpoint_for
 from udata.utils import get_by, hash_url, to_naive_datetime
 
 from .constants import (
@@ -33,7 +31,6 @@ from .constants import (
     CLOSED_FORMATS,
     DEFAULT_LICENSE,
     LEGACY_FREQUENCIES,
-    MAX_DISTANCE,
     PIVOTAL_DATA,
     RESOURCE_FILETYPES,
     RESOURCE_TYPES,
@@ -44,6 +41,7 @@ from .exceptions import (
     SchemasCacheUnavailableException,
     SchemasCatalogNotFoundException,
 )
+from .licenses import LicenseIndex
 from .preview import get_preview_url
 
 __all__ = (
@@ -56,6 +54,11 @@ __all__ = (
     "ResourceSchema",
 )
 
+LICENSES_INDEX_VERSION_KEY = "licenses-index-version"
+
+# Process-local `(version, LicenseIndex)` used by `License.guess`
+_licenses_index = (None, None)
+
 BADGES: dict[str, str] = {
     PIVOTAL_DATA: _("Pivotal data"),
 }
@@ -250,72 +253,41 @@ class License(db.Document):
 
         Try to exact match on identifier then slugified title
         and fallback on edit distance ranking (after slugification)
+        using the in-memory licenses index.
         """
         if not text:
             return
-        qs = cls.objects
         text = text.strip().lower()  # Stored identifiers are lower case
         slug = cls.slug.slugify(text)  # Use slug as it normalize string
-        license = qs(
-            db.Q(id__iexact=text)
-            | db.Q(slug=slug)
-            | db.Q(url__iexact=text)
-            | db.Q(alternate_urls__iexact=text)
-        ).first()
-
-        if license is None:
-            # If we're dealing with an URL, let's try some specific stuff
-            # like getting rid of trailing slash and scheme mismatch
-            try:
-                url = validate_url(text)
-            except ValidationError:
-                pass
-            else:
-                parsed = urlparse(url)
-                path = parsed.path.rstrip("/")
-                query = f"{parsed.netloc}{path}"
-                license = qs(
-                    db.Q(url__icontains=query) | db.Q(alternate_urls__contains=query)
-                ).first()
-
-        if license is None:
-            # Try to single match `slug` with a low Damerau-Levenshtein distance
-            computed = ((license_, rdlevenshtein(license_.slug, slug)) for license_ in cls.objects)
-            candidates = [license_ for license_, d in computed if d <= MAX_DISTANCE]
-            # If there is more that one match, we cannot determinate
-            # which one is closer to safely choose between candidates
-            if len(candidates) == 1:
-                license = candidates[0]
-
-        if license is None:
-            # Try to match `title` with a low Damerau-Levenshtein distance
-            computed = (
-                (license_, rdlevenshtein(license_.title.lower(), text)) for license_ in cls.objects
-            )
-            candidates = [license_ for license_, d in computed if d <= MAX_DISTANCE]
-            # If there is more that one match, we cannot determinate
-            # which one is closer to safely choose between candidates
-            if len(candidates) == 1:
-                license = candidates[0]
-
-        if license is None:
-            # Try to single match `alternate_titles` with a low Damerau-Levenshtein distance
-            computed = (
-                (license_, rdlevenshtein(cls.slug.slugify(title_), slug))
-                for license_ in cls.objects
-                for title_ in license_.alternate_titles
-            )
-            candidates = [license_ for license_, distance_ in computed if distance_ <= MAX_DISTANCE]
-            # If there is more that one license matching, we cannot determinate
-            # which one is closer to safely choose between candidates
-            if len(set(candidates)) == 1:
-                license = candidates[0]
-        return license
+        return cls.index().guess(text, slug)
+
+    @classmethod
+    def index(cls) -> LicenseIndex:
+        """
+        The process-local index of all licenses.
+
+        It is rebuilt when the shared index version changes on license save or deletion.
+        Without a cached version (ie. a null cache), it is rebuilt on each call.
+        """
+        global _licenses_index
+        version = cache.get(LICENSES_INDEX_VERSION_KEY)
+        if version is None:
+            cache.add(LICENSES_INDEX_VERSION_KEY, time.time())
+            version = cache.get(LICENSES_INDEX_VERSION_KEY)
+        if version is None or _licenses_index[0] != version:
+            index = LicenseIndex(cls.objects.no_cache(), cls.slug.slugify)
+            _licenses_index = (version, index)
+        return _licenses_index[1]
 
     @classmethod
     def default(cls):
         return cls.objects(id=DEFAULT_LICENSE["id"]).first()
 
+    @classmethod
+    def invalidate_index(cls, sender, document, **kwargs):
+        """Change the licenses index version so every process rebuilds its index"""
+        cache.set(LICENSES_INDEX_VERSION_KEY, time.time())
+
 
 class DatasetQuerySet(OwnedQuerySet):
     def visible(self):
@@ -565,6 +537,9 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
 
     contact_point = db.ReferenceField("ContactPoint", reverse_delete_rule=db.NULLIFY)
 
+    # Stored `quality`, refreshed on save and resources changes, to be queried and sorted on
+    quality_cached = db.DictField()
+
     created_at_internal = DateTimeField(
         verbose_name=_("Creation date"), default=datetime.utcnow, required=True
     )
@@ -596,6 +571,8 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
             "slug",
             "resources.id",
             "resources.urlhash",
+            "harvest.remote_id",
+            "quality_cached.score",
         ]
         + Owned.meta["indexes"],
         "ordering": ["-created_at_internal"],
@@ -638,6 +615,8 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
         if self.frequency in LEGACY_FREQUENCIES:
             self.frequency = LEGACY_FREQUENCIES[self.frequency]
 
+        self.quality_cached = self.compute_quality()
+
         for key, value in self.extras.items():
             if not key.startswith("custom:"):
                 continue
@@ -790,7 +769,7 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
         else:
             return self.last_update + delta
 
-    @cached_property
+    @property
     def quality(self):
         """Return a dict filled with metrics related to the inner
 
@@ -799,12 +778,18 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
             * number of tags
             * description length
             * and so on
+
+        The stored quality is returned, it is computed on the fly
+        only for datasets saved before quality was stored.
         """
-        result = {}
         if not self.id:
             # Quality is only relevant on saved Datasets
-            return result
+            return {}
+        return self.quality_cached or self.compute_quality()
 
+    def compute_quality(self):
+        """Compute the quality dict and its score from the dataset metadata and resources"""
+        result = {}
         result["license"] = True if self.license else False
         result["temporal_coverage"] = True if self.temporal_coverage else False
         result["spatial"] = True if self.spatial else False
@@ -823,7 +808,7 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
 
         result["dataset_description_quality"] = (
             True
-            if len(self.description) > current_app.config.get("QUALITY_DESCRIPTION_LENGTH")
+            if len(self.description or "") > current_app.config.get("QUALITY_DESCRIPTION_LENGTH")
             else False
         )
 
@@ -845,6 +830,17 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
         result["score"] = self.compute_quality_score(result)
         return result
 
+    def update_quality(self):
+        """
+        Store the dataset quality if it changed.
+
+        Only the quality is updated: the dataset is not saved and no signal is sent.
+        """
+        quality = self.compute_quality()
+        if quality != self.quality_cached:
+            self.update(set__quality_cached=quality)
+            self.quality_cached = quality
+
     @property
     def downloads(self):
         return sum(resource.metrics.get("views", 0) for resource in self.resources)
@@ -901,6 +897,7 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
             __raw__={"$push": {"resources": {"$each": [resource.to_mongo()], "$position": 0}}}
         )
         self.reload()
+        self.update_quality()
         self.on_resource_added.send(self.__class__, document=self, resource_id=resource.id)
 
     def update_resource(self, resource):
@@ -909,6 +906,7 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
         data = {"resources__{index}".format(index=index): resource}
         self.update(**data)
         self.reload()
+        self.update_quality()
         self.on_resource_updated.send(self.__class__, document=self, resource_id=resource.id)
 
     def remove_resource(self, resource):
@@ -989,6 +987,8 @@ class Dataset(WithMetrics, DatasetBadgeMixin, Owned, db.Document):
         self.save()
 
 
+post_save.connect(License.invalidate_index, sender=License)
+post_delete.connect(License.invalidate_index, sender=License)
 pre_save.connect(Dataset.pre_save, sender=Dataset)
 post_save.connect(Dataset.post_save, sender=Dataset)
 
@@ -12,6 +12,7 @@ from udata.search import (
     TemporalCoverageFilter,
     register,
 )
+from udata.search.adapter import reference_id
 from udata.utils import to_iso_datetime
 
 __all__ = ("DatasetSearch",)
@@ -64,13 +65,49 @@ class DatasetSearch(ModelSearchAdapter):
 
     @classmethod
     def serialize(cls, dataset):
+        return cls.serialize_many([dataset])[0]
+
+    @classmethod
+    def serialize_many(cls, datasets):
+        organizations, owners = cls.fetch_owners(datasets)
+        topics = cls.fetch_topics(datasets)
+        zones = cls.fetch_zones(datasets)
+        return [
+            cls._serialize(dataset, organizations, owners, topics, zones) for dataset in datasets
+        ]
+
+    @staticmethod
+    def fetch_topics(datasets):
+        """Map each dataset id to the ids of the topics it belongs to, in a single query"""
+        ids = [dataset.id for dataset in datasets]
+        pipeline = [
+            {"$project": {"datasets": 1}},
+            {"$unwind": "$datasets"},
+            {"$match": {"datasets": {"$in": ids}}},
+            {"$group": {"_id": "$datasets", "topics": {"$push": "$_id"}}},
+        ]
+        return {
+            row["_id"]: row["topics"] for row in Topic.objects(datasets__in=ids).aggregate(pipeline)
+        }
+
+    @staticmethod
+    def fetch_zones(datasets):
+        """Fetch the spatial coverage zones of a chunk of datasets in a single query"""
+        zone_ids = {
+            getattr(zone, "id", zone)
+            for dataset in datasets
+            if dataset.spatial is not None
+            for zone in dataset.spatial._data.get("zones") or []
+        }
+        return {zone.id: zone for zone in GeoZone.objects(id__in=zone_ids)} if zone_ids else {}
+
+    @classmethod
+    def _serialize(cls, dataset, organizations, owners, topics, zones):
         organization = None
         owner = None
 
-        topics = Topic.objects(datasets=dataset).only("id")
-
-        if dataset.organization:
-            org = Organization.objects(id=dataset.organization.id).first()
+        if org_id := reference_id(dataset, "organization"):
+            org = organizations.get(org_id)
             organization = {
                 "id": str(org.id),
                 "name": org.name,
@@ -78,8 +115,8 @@ class DatasetSearch(ModelSearchAdapter):
                 "followers": org.metrics.get("followers", 0),
                 "badges": [badge.kind for badge in org.badges],
             }
-        elif dataset.owner:
-            owner = User.objects(id=dataset.owner.id).first()
+        elif owner_id := reference_id(dataset, "owner"):
+            owner = owners.get(owner_id)
 
         document = {
             "id": str(dataset.id),
@@ -88,7 +125,7 @@ class DatasetSearch(ModelSearchAdapter):
             "acronym": dataset.acronym or None,
             "url": dataset.display_url,
             "tags": dataset.tags,
-            "license": getattr(dataset.license, "id", None),
+            "license": reference_id(dataset, "license"),
             "badges": [badge.kind for badge in dataset.badges],
             "frequency": dataset.frequency,
             "created_at": to_iso_datetime(dataset.created_at),
@@ -102,7 +139,7 @@ class DatasetSearch(ModelSearchAdapter):
             "owner": str(owner.id) if owner else None,
             "format": [r.format.lower() for r in dataset.resources if r.format],
             "schema": [r.schema.name for r in dataset.resources if r.schema],
-            "topics": [str(t.id) for t in topics if topics],
+            "topics": [str(topic_id) for topic_id in topics.get(dataset.id, [])],
         }
         extras = {}
         for key, value in dataset.extras.items():
@@ -132,11 +169,10 @@ class DatasetSearch(ModelSearchAdapter):
 
         if dataset.spatial is not None:
             # Index precise zone labels to allow fast filtering.
-            zone_ids = [z.id for z in dataset.spatial.zones]
-            zones = GeoZone.objects(id__in=zone_ids)
+            zone_ids = [getattr(z, "id", z) for z in dataset.spatial._data.get("zones") or []]
             geozones = []
             coverage_level = ADMIN_LEVEL_MAX
-            for zone in zones:
+            for zone in (zones[zone_id] for zone_id in zone_ids if zone_id in zones):
                 geozones.append(
                     {
                         "id": zone.id,
@@ -1,4 +1,5 @@
 import collections
+import gzip
 import os
 from datetime import datetime, timedelta
 from tempfile import NamedTemporaryFile
@@ -6,6 +7,7 @@ from tempfile import NamedTemporaryFile
 from celery.utils.log import get_task_logger
 from flask import current_app
 from mongoengine import ValidationError
+from pymongo import UpdateOne
 
 from udata import mail
 from udata import models as udata_models
@@ -16,6 +18,7 @@ from udata.harvest.models import HarvestJob
 from udata.i18n import lazy_gettext as _
 from udata.models import Activity, Discussion, Follow, Organization, Topic, Transfer, db
 from udata.tasks import job
+from udata.utils import batched
 
 from .constants import UPDATE_FREQUENCIES
 from .models import Checksum, CommunityResource, Dataset, Resource
@@ -126,6 +129,31 @@ def update_datasets_reuses_metrics(self):
         dataset.count_reuses()
 
 
+@job("update-datasets-quality")
+def update_datasets_quality(self, batch_size=1000):
+    """
+    Recompute the stored quality of every dataset.
+
+    Quality is refreshed on datasets changes but its `update_fulfilled_in_time` criterion
+    depends on the current date, so this job should be run periodically.
+    Only changed qualities are written, with one bulk write per batch.
+    """
+    datasets = Dataset.objects.no_dereference().no_cache().timeout(False)
+    updated = 0
+    for batch in batched(datasets, batch_size):
+        operations = []
+        for dataset in batch:
+            quality = dataset.compute_quality()
+            if quality != dataset.quality_cached:
+                operations.append(
+                    UpdateOne({"_id": dataset.id}, {"$set": {"quality_cached": quality}})
+                )
+        if operations:
+            Dataset._get_collection().bulk_write(operations, ordered=False)
+            updated += len(operations)
+    log.info("Updated the quality of %s datasets", updated)
+
+
 def get_queryset(model_cls):
     # special case for resources
     if model_cls.__name__ == "Resource":
@@ -155,9 +183,11 @@ def get_or_create_resource(r_info, model, dataset):
         return True, Resource(**r_info)
 
 
-def store_resource(csvfile, model, dataset):
+def store_resource(csvfile, model, dataset, compressed=False):
     timestr = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
     filename = "export-%s-%s.csv" % (model, timestr)
+    if compressed:
+        filename += ".gz"
     prefix = "/".join((dataset.slug, timestr))
     storage = storages.resources
     with open(csvfile.name, "rb") as infile:
@@ -189,16 +219,18 @@ def export_csv_for_model(model, dataset):
 
     log.info("Exporting CSV for %s..." % model)
 
+    compress = current_app.config["EXPORT_CSV_COMPRESS"]
     csvfile = NamedTemporaryFile(mode="w", encoding="utf8", delete=False)
     try:
         # write adapter results into a tmp file
-        writer = csv.get_writer(csvfile)
-        writer.writerow(adapter.header())
-        for row in adapter.rows():
-            writer.writerow(row)
-        csvfile.flush()
+        if compress:
+            with gzip.open(csvfile.name, "wt", encoding="utf8") as out:
+                csv.write(adapter, out)
+        else:
+            csv.write(adapter, csvfile)
+            csvfile.flush()
         # make a resource from this tmp file
-        created, resource = store_resource(csvfile, model, dataset)
+        created, resource = store_resource(csvfile, model, dataset, compress)
         # add it to the dataset
         if created:
             dataset.add_resource(resource)
@@ -1,10 +1,24 @@
+from udata.core.dataservices.models import Dataservice
+from udata.core.metrics.bulk import count_by_reference
+from udata.core.metrics.counters import counter, metrics_queue
+from udata.models import Dataset, Reuse
+
+from .models import Discussion
 from .signals import on_discussion_closed, on_discussion_deleted, on_new_discussion
 
 
+def count_discussions(objects):
+    return count_by_reference(
+        Discussion.objects(closed=None), "subject", objects._document, ids=objects.scalar("id")
+    )
+
+
+for model in (Dataset, Reuse, Dataservice):
+    counter(model, "discussions")(count_discussions)
+
+
 @on_new_discussion.connect
 @on_discussion_closed.connect
 @on_discussion_deleted.connect
 def update_discussions_metric(discussion, **kwargs):
-    model = discussion.subject.__class__
-    obj = model.objects(id=discussion.subject.id).first()
-    obj.count_discussions()
+    metrics_queue.add(discussion.subject, "discussions")
@@ -1,8 +1,23 @@
+from udata.core.dataservices.models import Dataservice
+from udata.core.metrics.bulk import count_by_reference
+from udata.core.metrics.counters import counter, metrics_queue
+from udata.models import Dataset, Organization, Reuse, User
+
+from .models import Follow
 from .signals import on_follow, on_unfollow
 
 
+def count_followers(objects):
+    return count_by_reference(
+        Follow.objects(until=None), "following", objects._document, ids=objects.scalar("id")
+    )
+
+
+for model in (Dataset, Reuse, Organization, User, Dataservice):
+    counter(model, "followers")(count_followers)
+
+
 @on_follow.connect
 @on_unfollow.connect
 def update_followers_metric(document, **kwargs):
-    doc = document.following
-    doc.count_followers()
+    metrics_queue.add(document.following, "followers")
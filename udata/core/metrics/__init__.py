@@ -2,6 +2,10 @@ from udata import entrypoints
 
 
 def init_app(app):
+    from .counters import flush_metrics_queue
+
+    app.teardown_appcontext(flush_metrics_queue)
+
     # Load all core metrics
     import udata.core.user.metrics  # noqa
     import udata.core.organization.metrics  # noqa
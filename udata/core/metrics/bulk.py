@@ -0,0 +1,137 @@
+"""
+Bulk metrics computation.
+
+Each metric is computed for all objects at once with a single `$group` aggregation
+on its source collection, then written back with unordered bulk `$set` updates
+on the `metrics.*` keys only (no document save, no signal).
+"""
+
+import logging
+
+from bson import DBRef
+from pymongo import UpdateOne
+
+from udata.utils import batched
+
+log = logging.getLogger(__name__)
+
+BULK_SIZE = 1000
+
+
+def count_by(queryset, field, unwind=False):
+    """
+    Count the documents of a queryset per value of `field`.
+
+    With `unwind`, `field` is a list and each document is counted once per distinct value.
+    """
+    pipeline = []
+    if unwind:
+        pipeline += [
+            {"$project": {field: {"$setUnion": [f"${field}", []]}}},
+            {"$unwind": f"${field}"},
+        ]
+    pipeline.append({"$group": {"_id": f"${field}", "count": {"$sum": 1}}})
+    return {row["_id"]: row["count"] for row in queryset.aggregate(pipeline) if row["_id"]}
+
+
+def count_by_reference(queryset, field, model, ids=None):
+    """
+    Count the documents of a queryset per `model` object targeted by a generic reference.
+
+    With `ids`, only references to those `model` objects are counted.
+    """
+    match = {f"{field}._cls": model.__name__}
+    if ids is not None:
+        collection = model._get_collection_name()
+        match[f"{field}._ref"] = {"$in": [DBRef(collection, id) for id in ids]}
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": f"${field}._ref", "count": {"$sum": 1}}},
+    ]
+    return {row["_id"].id: row["count"] for row in queryset.aggregate(pipeline)}
+
+
+def count_list(queryset, field):
+    """Count the items of a list `field` for each document of a queryset"""
+    pipeline = [{"$project": {"count": {"$size": {"$ifNull": [f"${field}", []]}}}}]
+    return {row["_id"]: row["count"] for row in queryset.aggregate(pipeline)}
+
+
+def write_metrics(queryset, metrics, drop=False):
+    """
+    Write computed `metrics` to each document of `queryset`.
+
+    `metrics` maps a metric name to counts indexed by document id,
+    documents absent from a count have this metric set to 0.
+    With `drop`, other existing metrics are cleared.
+    Return the number of updated documents.
+    """
+    collection = queryset._document._get_collection()
+    ids = queryset.scalar("id").no_cache().timeout(False)
+    updated = 0
+    for chunk in batched(ids, BULK_SIZE):
+        operations = []
+        for id in chunk:
+            values = {name: counts.get(id, 0) for name, counts in metrics.items()}
+            if drop:
+                update = {"$set": {"metrics": values}}
+            else:
+                update = {"$set": {f"metrics.{name}": value for name, value in values.items()}}
+            operations.append(UpdateOne({"_id": id}, update))
+        result = collection.bulk_write(operations, ordered=False)
+        updated += result.matched_count
+    return updated
+
+
+def update_datasets_metrics(drop=False):
+    from udata.models import Dataset, Discussion, Follow, Reuse
+
+    metrics = {
+        "discussions": count_by_reference(Discussion.objects(closed=None), "subject", Dataset),
+        "reuses": count_by(Reuse.objects.visible(), "datasets", unwind=True),
+        "followers": count_by_reference(Follow.objects(until=None), "following", Dataset),
+    }
+    return write_metrics(Dataset.objects.visible(), metrics, drop)
+
+
+def update_reuses_metrics(drop=False):
+    from udata.models import Discussion, Follow, Reuse
+
+    metrics = {
+        "discussions": count_by_reference(Discussion.objects(closed=None), "subject", Reuse),
+        "followers": count_by_reference(Follow.objects(until=None), "following", Reuse),
+    }
+    return write_metrics(Reuse.objects.visible(), metrics, drop)
+
+
+def update_organizations_metrics(drop=False):
+    from udata.models import Dataset, Follow, Organization, Reuse
+
+    metrics = {
+        "datasets": count_by(Dataset.objects.visible(), "organization"),
+        "reuses": count_by(Reuse.objects.visible(), "organization"),
+        "followers": count_by_reference(Follow.objects(until=None), "following", Organization),
+        "members": count_list(Organization.objects.visible(), "members"),
+    }
+    return write_metrics(Organization.objects.visible(), metrics, drop)
+
+
+def update_users_metrics(drop=False):
+    from udata.models import Dataset, Follow, Reuse, User
+
+    metrics = {
+        "datasets": count_by(Dataset.objects.visible(), "owner"),
+        "reuses": count_by(Reuse.objects.visible(), "owner"),
+        "followers": count_by_reference(Follow.objects(until=None), "following", User),
+        "following": count_by(Follow.objects(until=None), "follower"),
+    }
+    return write_metrics(User.objects, metrics, drop)
+
+
+def update_geozones_metrics(drop=False):
+    from udata.models import Dataset, GeoZone
+
+    metrics = {
+        "datasets": count_by(Dataset.objects.visible(), "spatial.zones", unwind=True),
+    }
+    return write_metrics(GeoZone.objects, metrics, drop)
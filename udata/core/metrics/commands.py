@@ -1,10 +1,12 @@
 import logging
+import time
 
 import click
 from flask import current_app
 
 from udata.commands import cli, success
-from udata.models import Dataset, GeoZone, Organization, Reuse, Site, User
+from udata.core.metrics import bulk
+from udata.models import Site
 
 log = logging.getLogger(__name__)
 
@@ -32,105 +34,39 @@ def update(
     geozones=False,
     drop=False,
 ):
-    """Update all metrics for the current date"""
+    """
+    Update all metrics for the current date
+
+    Objects metrics are computed in bulk with one aggregation per metric
+    and written back without saving documents (search indexes are not updated).
+    """
     do_all = not any((site, organizations, users, datasets, reuses, geozones))
 
     if do_all or site:
         log.info("Update site metrics")
         try:
             site = Site.objects(id=current_app.config["SITE_ID"]).first()
-            if drop:
-                site.metrics.clear()
-            site.count_users()
-            site.count_org()
-            site.count_datasets()
-            site.count_resources()
-            site.count_reuses()
-            site.count_followers()
-            site.count_discussions()
-            site.count_harvesters()
-            site.count_max_dataset_followers()
-            site.count_max_dataset_reuses()
-            site.count_max_reuse_datasets()
-            site.count_max_reuse_followers()
-            site.count_max_org_followers()
-            site.count_max_org_reuses()
-            site.count_max_org_datasets()
+            timings = site.compute_metrics(drop=drop)
+            for name, duration in sorted(timings.items(), key=lambda t: -t[1]):
+                log.info("Site %s metrics computed in %.2fs", name, duration)
         except Exception as e:
             log.info(f"Error during update: {e}")
 
-    if do_all or datasets:
-        log.info("Update datasets metrics")
-        all_datasets = Dataset.objects.visible().timeout(False)
-        with click.progressbar(all_datasets, length=Dataset.objects.count()) as dataset_bar:
-            for dataset in dataset_bar:
-                try:
-                    if drop:
-                        dataset.metrics.clear()
-                    dataset.count_discussions()
-                    dataset.count_reuses()
-                    dataset.count_followers()
-                except Exception as e:
-                    log.info(f"Error during update: {e}")
-                    continue
-
-    if do_all or reuses:
-        log.info("Update reuses metrics")
-        all_reuses = Reuse.objects.visible().timeout(False)
-        with click.progressbar(all_reuses, length=Reuse.objects.visible().count()) as reuses_bar:
-            for reuse in reuses_bar:
-                try:
-                    if drop:
-                        reuse.metrics.clear()
-                    reuse.count_discussions()
-                    reuse.count_followers()
-                except Exception as e:
-                    log.info(f"Error during update: {e}")
-                    continue
-
-    if do_all or organizations:
-        log.info("Update organizations metrics")
-        all_org = Organization.objects.visible().timeout(False)
-        with click.progressbar(all_org, length=Organization.objects.visible().count()) as org_bar:
-            for organization in org_bar:
-                try:
-                    if drop:
-                        organization.metrics.clear()
-                    organization.count_datasets()
-                    organization.count_reuses()
-                    organization.count_followers()
-                    organization.count_members()
-                except Exception as e:
-                    log.info(f"Error during update: {e}")
-                    continue
-
-    if do_all or users:
-        log.info("Update user metrics")
-        all_users = User.objects.timeout(False)
-        with click.progressbar(all_users, length=User.objects.count()) as users_bar:
-            for user in users_bar:
-                try:
-                    if drop:
-                        user.metrics.clear()
-                    user.count_datasets()
-                    user.count_reuses()
-                    user.count_followers()
-                    user.count_following()
-                except Exception as e:
-                    log.info(f"Error during update: {e}")
-                    continue
-
-    if do_all or geozones:
-        log.info("Update GeoZone metrics")
-        all_geozones = GeoZone.objects.timeout(False)
-        with click.progressbar(all_geozones, length=GeoZone.objects.count()) as geozones_bar:
-            for geozone in geozones_bar:
-                try:
-                    if drop:
-                        geozone.metrics.clear()
-                    geozone.count_datasets()
-                except Exception as e:
-                    log.info(f"Error during update: {e}")
-                    continue
+    bulk_updates = (
+        (datasets, "datasets", bulk.update_datasets_metrics),
+        (reuses, "reuses", bulk.update_reuses_metrics),
+        (organizations, "organizations", bulk.update_organizations_metrics),
+        (users, "users", bulk.update_users_metrics),
+        (geozones, "geozones", bulk.update_geozones_metrics),
+    )
+    for selected, name, update_metrics in bulk_updates:
+        if do_all or selected:
+            log.info("Update %s metrics", name)
+            try:
+                start = time.perf_counter()
+                count = update_metrics(drop=drop)
+                log.info("Updated %d %s in %.2fs", count, name, time.perf_counter() - start)
+            except Exception as e:
+                log.info(f"Error during update: {e}")
 
     success("All metrics have been updated")
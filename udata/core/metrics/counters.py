@@ -0,0 +1,97 @@
+"""
+Coalesced metrics maintenance.
+
+Signal handlers only mark a metric of an object as dirty with `metrics_queue.add`,
+dirty metrics are then recomputed by an `update_metrics` task for a whole batch
+of objects and written back with `$set` on their `metrics.*` keys only
+(no document save, no signal).
+"""
+
+import logging
+
+from flask import current_app
+
+from udata.mongo import db
+from udata.tasks import DebouncedQueue, task
+
+from .bulk import write_metrics
+
+log = logging.getLogger(__name__)
+
+# Functions computing a metric for a queryset of objects, by model name then metric name
+COUNTERS = {}
+
+
+def counter(model, metric):
+    """
+    Register a function computing a `metric` of `model` objects.
+
+    The function is given a queryset of the objects to update
+    and returns the metric value indexed by object id (missing objects default to 0).
+    """
+
+    def wrapper(func):
+        COUNTERS.setdefault(model.__name__, {})[metric] = func
+        return func
+
+    return wrapper
+
+
+@task
+def update_metrics(classname, metric, ids):
+    """Recompute a metric for a batch of objects of a given model"""
+    func = COUNTERS.get(classname, {}).get(metric)
+    if func is None:
+        log.error("No counter registered for %s %s metric", classname, metric)
+        return
+    model = db.resolve_model(classname)
+    queryset = model.objects(id__in=ids)
+    write_metrics(queryset, {metric: func(queryset)})
+    reindex_objects(classname, ids)
+
+
+def reindex_objects(classname, ids):
+    """Queue the search reindexation of objects whose metrics changed"""
+    from udata.search import adapter_catalog, reindex_many
+
+    model = db.resolve_model(classname)
+    if (
+        model in adapter_catalog
+        and current_app.config.get("AUTO_INDEX")
+        and current_app.config["SEARCH_SERVICE_API_URL"]
+    ):
+        reindex_many.delay(classname, [str(id) for id in ids])
+
+
+def dispatch_metrics(group, ids):
+    classname, metric = group
+    update_metrics.delay(classname, metric, ids)
+
+
+class MetricsQueue(DebouncedQueue):
+    """
+    A process-local set of dirty object metrics.
+
+    Marking the same metric of a same object several times within the debounce window
+    only recomputes it once, and pending metrics are dispatched as one `update_metrics` task
+    per model, metric and batch.
+    """
+
+    def __init__(self):
+        super().__init__(dispatch_metrics, "METRICS_DEBOUNCE", "METRICS_BATCH_SIZE")
+
+    def add(self, document, metric):
+        classname = document.__class__.__name__
+        if metric not in COUNTERS.get(classname, {}):
+            return
+        if not current_app.config["METRICS_DEBOUNCE"]:
+            update_metrics.delay(classname, metric, [str(document.id)])
+            return
+        super().add((classname, metric), str(document.id))
+
+
+metrics_queue = MetricsQueue()
+
+
+def flush_metrics_queue(exception=None):
+    metrics_queue.flush()
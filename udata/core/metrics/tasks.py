@@ -8,20 +8,10 @@ from udata.tasks import job
 @job("compute-site-metrics")
 def compute_site_metrics(self):
     site = Site.objects(id=current_app.config["SITE_ID"]).first()
-    site.count_users()
-    site.count_org()
-    site.count_datasets()
-    site.count_resources()
-    site.count_reuses()
-    site.count_followers()
-    site.count_discussions()
-    site.count_harvesters()
-    site.count_max_dataset_followers()
-    site.count_max_dataset_reuses()
-    site.count_max_reuse_datasets()
-    site.count_max_reuse_followers()
-    site.count_max_org_followers()
-    site.count_max_org_reuses()
-    site.count_max_org_datasets()
+    timings = site.compute_metrics()
+    self.log.info(
+        "Site metrics computed: %s",
+        ", ".join(f"{name} in {duration:.2f}s" for name, duration in timings.items()),
+    )
     # Sending signal
     on_site_metrics_computed.send(site)
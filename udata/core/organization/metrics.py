@@ -1,13 +1,29 @@
+from udata.core.metrics.bulk import count_by
+from udata.core.metrics.counters import counter, metrics_queue
 from udata.core.owned import Owned
 from udata.models import Dataset, Organization, Reuse
 
 
+@counter(Organization, "datasets")
+def count_datasets(organizations):
+    return count_by(
+        Dataset.objects(organization__in=list(organizations.scalar("id"))).visible(), "organization"
+    )
+
+
+@counter(Organization, "reuses")
+def count_reuses(organizations):
+    return count_by(
+        Reuse.objects(organization__in=list(organizations.scalar("id"))).visible(), "organization"
+    )
+
+
 @Dataset.on_create.connect
 @Dataset.on_update.connect
 @Dataset.on_delete.connect
 def update_datasets_metrics(document, **kwargs):
     if document.organization:
-        document.organization.count_datasets()
+        metrics_queue.add(document.organization, "datasets")
 
 
 @Reuse.on_create.connect
@@ -15,7 +31,7 @@ def update_datasets_metrics(document, **kwargs):
 @Reuse.on_delete.connect
 def update_reuses_metrics(document, **kwargs):
     if document.organization:
-        document.organization.count_reuses()
+        metrics_queue.add(document.organization, "reuses")
 
 
 @Owned.on_owner_change.connect
@@ -23,6 +39,6 @@ def update_org_metrics(document, previous):
     if not isinstance(previous, Organization):
         return
     if isinstance(document, Dataset):
-        previous.count_datasets()
+        metrics_queue.add(previous, "datasets")
     elif isinstance(document, Reuse):
-        previous.count_reuses()
+        metrics_queue.add(previous, "reuses")
@@ -1,7 +1,14 @@
+from udata.core.metrics.bulk import count_list
+from udata.core.metrics.counters import counter, metrics_queue
 from udata.models import Reuse
 
 
+@counter(Reuse, "datasets")
+def count_datasets(reuses):
+    return count_list(reuses, "datasets")
+
+
 @Reuse.on_create.connect
 @Reuse.on_update.connect
 def update_reuses_dataset_metric(reuse: Reuse, **kwargs) -> None:
-    reuse.count_datasets()
+    metrics_queue.add(reuse, "datasets")
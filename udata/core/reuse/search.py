@@ -9,6 +9,7 @@ from udata.search import (
     ModelTermsFilter,
     register,
 )
+from udata.search.adapter import reference_id
 from udata.utils import to_iso_datetime
 
 __all__ = ("ReuseSearch",)
@@ -56,10 +57,19 @@ class ReuseSearch(ModelSearchAdapter):
 
     @classmethod
     def serialize(cls, reuse: Reuse) -> dict:
+        return cls.serialize_many([reuse])[0]
+
+    @classmethod
+    def serialize_many(cls, reuses: list[Reuse]) -> list[dict]:
+        organizations, owners = cls.fetch_owners(reuses)
+        return [cls._serialize(reuse, organizations, owners) for reuse in reuses]
+
+    @classmethod
+    def _serialize(cls, reuse: Reuse, organizations: dict, owners: dict) -> dict:
         organization = None
         owner = None
-        if reuse.organization:
-            org = Organization.objects(id=reuse.organization.id).first()
+        if org_id := reference_id(reuse, "organization"):
+            org = organizations.get(org_id)
             organization = {
                 "id": str(org.id),
                 "name": org.name,
@@ -67,8 +77,8 @@ class ReuseSearch(ModelSearchAdapter):
                 "followers": org.metrics.get("followers", 0),
                 "badges": [badge.kind for badge in org.badges],
             }
-        elif reuse.owner:
-            owner = User.objects(id=reuse.owner.id).first()
+        elif owner_id := reference_id(reuse, "owner"):
+            owner = owners.get(owner_id)
 
         extras = {}
         for key, value in reuse.extras.items():
@@ -1,16 +1,25 @@
+from datetime import datetime
+
 from bson import ObjectId
-from flask import json, make_response, redirect, request, url_for
+from flask import abort, current_app, json, make_response, redirect, request, url_for
 
 from udata.api import API, api, fields
+from udata.app import cache
 from udata.auth import admin_permission
 from udata.core.dataservices.models import Dataservice
 from udata.core.dataset.api_fields import dataset_fields
 from udata.models import Dataset, Reuse
-from udata.rdf import CONTEXT, RDF_EXTENSIONS, graph_response, negociate_content
+from udata.rdf import (
+    CONTEXT,
+    RDF_EXTENSIONS,
+    graph_response,
+    negociate_content,
+    stream_response,
+)
 from udata.utils import multi_to_dict
 
 from .models import current_site
-from .rdf import build_catalog
+from .rdf import build_catalog, catalog_page_cache_key, catalog_page_etag, iter_catalog
 
 site_fields = api.model(
     "Site",
@@ -102,16 +111,66 @@ class SiteRdfCatalogFormat(API):
         params = multi_to_dict(request.args)
         page = int(params.get("page", 1))
         page_size = int(params.get("page_size", 100))
+        if page < 1:
+            abort(404)
         datasets = Dataset.objects.visible()
         if "tag" in params:
             datasets = datasets.filter(tags=params.get("tag", ""))
-        datasets = datasets.paginate(page, page_size)
-        dataservices = Dataservice.objects.visible().filter_by_dataset_pagination(datasets, page)
+        # Only identify the page content, documents are loaded on cache miss only
+        total = datasets.count()
+        page_datasets = datasets.skip((page - 1) * page_size).limit(page_size)
+        dataset_rows = list(page_datasets.only("id", "organization").as_pymongo())
+        dataset_ids = [row["_id"] for row in dataset_rows]
+        if not dataset_ids and page != 1:
+            abort(404)
+        dataservices = Dataservice.objects.visible().filter_by_dataset_pagination(dataset_ids, page)
+        dataservice_rows = list(dataservices.only("id", "organization").as_pymongo())
+        dataservice_ids = [row["_id"] for row in dataservice_rows]
+        # Publishers are described along with their datasets and dataservices
+        organization_ids = {
+            row["organization"]
+            for row in (*dataset_rows, *dataservice_rows)
+            if row.get("organization")
+        }
+
+        key = catalog_page_cache_key(format, page, page_size, params.get("tag"))
+        etag = catalog_page_etag(
+            current_site, key, total, dataset_ids, dataservice_ids, organization_ids
+        )
+        if request.if_none_match.contains(etag):
+            return make_response("", 304, {"ETag": f'"{etag}"'})
+
+        cached = cache.get(key)
+        if not cached or cached["etag"] != etag:
+            datasets = datasets.paginate(page, page_size)
+            catalog = build_catalog(
+                current_site, datasets, dataservices=dataservices, format=format
+            )
+            body, _, headers = graph_response(catalog, format)
+            cached = {
+                "etag": etag,
+                "body": body,
+                "headers": headers,
+                "last_modified": datetime.utcnow().replace(microsecond=0),
+            }
+            cache.set(key, cached, timeout=current_app.config["SITE_CATALOG_CACHE_DURATION"])
 
-        catalog = build_catalog(current_site, datasets, dataservices=dataservices, format=format)
         # bypass flask-restplus make_response, since graph_response
         # is handling the content negociation directly
-        return make_response(*graph_response(catalog, format))
+        response = make_response(cached["body"], 200, cached["headers"])
+        response.set_etag(etag)
+        response.last_modified = cached["last_modified"]
+        return response.make_conditional(request)
+
+
+@api.route("/site/catalog/dump.<format>", endpoint="site_rdf_catalog_dump")
+class SiteRdfCatalogDump(API):
+    def get(self, format):
+        """Stream the whole site catalog in a single RDF document (N-Triples, Turtle or JSON-LD)"""
+        graphs = iter_catalog(
+            current_site, Dataset.objects.visible(), Dataservice.objects.visible()
+        )
+        return stream_response(graphs, format)
 
 
 @api.route("/site/context.jsonld", endpoint="site_jsonld_context")
@@ -1,6 +1,12 @@
+import logging
+import time
+
 from flask import current_app, g
+from mongoengine.signals import post_delete, post_save
 from werkzeug.local import LocalProxy
 
+from udata.app import cache
+from udata.core.dataservices.models import Dataservice
 from udata.core.dataset.models import Dataset
 from udata.core.organization.models import Organization
 from udata.core.reuse.models import Reuse
@@ -8,9 +14,13 @@ from udata.models import WithMetrics, db
 
 __all__ = ("Site", "SiteSettings")
 
+log = logging.getLogger(__name__)
+
 
 DEFAULT_FEED_SIZE = 20
 
+CATALOG_CACHE_KEY = "site-catalog"
+
 
 class SiteSettings(db.EmbeddedDocument):
     home_datasets = db.ListField(db.ReferenceField(Dataset))
@@ -48,6 +58,59 @@ class Site(WithMetrics, db.Document):
     def __str__(self):
         return self.title or ""
 
+    def compute_metrics(self, drop=False):
+        """
+        Compute all site metrics, with one aggregation per collection,
+        and persist them in a single atomic update.
+
+        Return the time spent (in seconds) on each aggregation.
+        """
+        from udata.harvest.models import HarvestSource
+        from udata.models import Discussion, Follow, User
+
+        counters = {
+            "datasets": lambda: facet_metrics(
+                Dataset.objects.visible(),
+                datasets=count_facet(),
+                resources=sum_facet({"$size": {"$ifNull": ["$resources", []]}}),
+                max_dataset_followers=max_facet("metrics.followers"),
+                max_dataset_reuses=max_facet("metrics.reuses"),
+            ),
+            "reuses": lambda: facet_metrics(
+                Reuse.objects.visible(),
+                reuses=count_facet(),
+                max_reuse_datasets=max_facet("metrics.datasets"),
+                max_reuse_followers=max_facet("metrics.followers"),
+            ),
+            "organizations": lambda: facet_metrics(
+                Organization.objects.visible(),
+                organizations=count_facet(),
+                max_org_followers=max_facet("metrics.followers"),
+                max_org_reuses=max_facet("metrics.reuses"),
+                max_org_datasets=max_facet("metrics.datasets"),
+            ),
+            "users": lambda: {"users": User.objects(confirmed_at__ne=None, deleted=None).count()},
+            "followers": lambda: {"followers": Follow.objects(until=None).count()},
+            "discussions": lambda: {"discussions": Discussion.objects.count()},
+            "harvesters": lambda: {"harvesters": HarvestSource.objects().count()},
+        }
+        values = {}
+        timings = {}
+        for name, counter in counters.items():
+            start = time.perf_counter()
+            values.update(counter())
+            timings[name] = time.perf_counter() - start
+            log.debug("Site %s metrics computed in %.3fs", name, timings[name])
+
+        if drop:
+            update = {"$set": {"metrics": values}}
+            self.metrics.clear()
+        else:
+            update = {"$set": {f"metrics.{key}": value for key, value in values.items()}}
+        self._get_collection().update_one({"_id": self.id}, update)
+        self.metrics.update(values)
+        return timings
+
     def count_users(self):
         from udata.models import User
 
@@ -167,6 +230,28 @@ class Site(WithMetrics, db.Document):
         self.save()
 
 
+def count_facet():
+    return [{"$count": "value"}]
+
+
+def sum_facet(expression):
+    return [{"$group": {"_id": None, "value": {"$sum": expression}}}]
+
+
+def max_facet(field):
+    return [{"$group": {"_id": None, "value": {"$max": f"${field}"}}}]
+
+
+def facet_metrics(queryset, **facets):
+    """
+    Compute several metrics on a queryset in a single `$facet` aggregation.
+
+    Each facet pipeline should output a single `value`, missing values default to 0.
+    """
+    result = next(queryset.aggregate([{"$facet": facets}]), {})
+    return {name: (result.get(name) or [{}])[0].get("value") or 0 for name in facets}
+
+
 def get_current_site():
     if getattr(g, "site", None) is None:
         site_id = current_app.config["SITE_ID"]
@@ -202,3 +287,27 @@ def remove_from_home_reuses(reuse):
     if reuse in current_site.settings.home_reuses:
         current_site.settings.home_reuses.remove(reuse)
         current_site.save()
+
+
+def catalog_version_key(id):
+    return f"{CATALOG_CACHE_KEY}:version:{id}"
+
+
+def invalidate_catalog_pages(sender, document, **kwargs):
+    """
+    Change the catalog version of a dataset, dataservice or publishing organization
+    so cached catalog pages listing it are rebuilt on their next request.
+    """
+    cache.set(
+        catalog_version_key(document.id),
+        time.time(),
+        timeout=current_app.config["SITE_CATALOG_CACHE_DURATION"],
+    )
+
+
+post_save.connect(invalidate_catalog_pages, sender=Dataset)
+post_delete.connect(invalidate_catalog_pages, sender=Dataset)
+post_save.connect(invalidate_catalog_pages, sender=Dataservice)
+post_delete.connect(invalidate_catalog_pages, sender=Dataservice)
+post_save.connect(invalidate_catalog_pages, sender=Organization)
+post_delete.connect(invalidate_catalog_pages, sender=Organization)
@@ -2,10 +2,13 @@
 This module centralize site helpers for RDF/DCAT serialization and parsing
 """
 
+import hashlib
+
 from flask import current_app, url_for
 from rdflib import BNode, Graph, Literal, URIRef
 from rdflib.namespace import FOAF, RDF
 
+from udata.app import cache
 from udata.core.dataservices.rdf import dataservice_to_rdf
 from udata.core.dataset.rdf import dataset_to_rdf
 from udata.core.organization.rdf import organization_to_rdf
@@ -14,32 +17,42 @@ from udata.rdf import DCAT, DCT, namespace_manager, paginate_catalog
 from udata.uris import endpoint_for
 from udata.utils import Paginable
 
+from .models import CATALOG_CACHE_KEY, catalog_version_key
 
-def build_catalog(site, datasets, dataservices=[], format=None):
-    """Build the DCAT catalog for this site"""
-    site_url = endpoint_for("site.home_redirect", "api.site", _external=True)
-    catalog_url = url_for("api.site_rdf_catalog", _external=True)
-    graph = Graph(namespace_manager=namespace_manager)
-    catalog = graph.resource(URIRef(catalog_url))
 
+def set_catalog_metadata(site, catalog):
+    """Describe the site on its DCAT catalog resource"""
+    site_url = endpoint_for("site.home_redirect", "api.site", _external=True)
     catalog.set(RDF.type, DCAT.Catalog)
     catalog.set(DCT.title, Literal(site.title))
     catalog.set(DCT.description, Literal(f"{site.title}"))
     catalog.set(DCT.language, Literal(current_app.config["DEFAULT_LANGUAGE"]))
     catalog.set(FOAF.homepage, URIRef(site_url))
 
-    publisher = graph.resource(BNode())
+    publisher = catalog.graph.resource(BNode())
     publisher.set(RDF.type, FOAF.Organization)
     publisher.set(FOAF.name, Literal(current_app.config["SITE_AUTHOR"]))
     catalog.set(DCT.publisher, publisher)
 
+
+def add_catalog_dataset(catalog, dataset):
+    rdf_dataset = dataset_to_rdf(dataset, catalog.graph)
+    if dataset.owner:
+        rdf_dataset.add(DCT.publisher, user_to_rdf(dataset.owner, catalog.graph))
+    elif dataset.organization:
+        rdf_dataset.add(DCT.publisher, organization_to_rdf(dataset.organization, catalog.graph))
+    catalog.add(DCAT.dataset, rdf_dataset)
+
+
+def build_catalog(site, datasets, dataservices=[], format=None):
+    """Build the DCAT catalog for this site"""
+    catalog_url = url_for("api.site_rdf_catalog", _external=True)
+    graph = Graph(namespace_manager=namespace_manager)
+    catalog = graph.resource(URIRef(catalog_url))
+    set_catalog_metadata(site, catalog)
+
     for dataset in datasets:
-        rdf_dataset = dataset_to_rdf(dataset, graph)
-        if dataset.owner:
-            rdf_dataset.add(DCT.publisher, user_to_rdf(dataset.owner, graph))
-        elif dataset.organization:
-            rdf_dataset.add(DCT.publisher, organization_to_rdf(dataset.organization, graph))
-        catalog.add(DCAT.dataset, rdf_dataset)
+        add_catalog_dataset(catalog, dataset)
 
     for dataservice in dataservices:
         rdf_dataservice = dataservice_to_rdf(dataservice, graph)
@@ -49,3 +62,47 @@ def build_catalog(site, datasets, dataservices=[], format=None):
         paginate_catalog(catalog, graph, datasets, format, "api.site_rdf_catalog_format")
 
     return catalog
+
+
+def iter_catalog(site, datasets, dataservices):
+    """
+    Build the whole DCAT catalog for this site as a sequence of graphs.
+
+    The first graph describes the catalog, then each dataset and dataservice
+    of the given querysets has its own graph, linked to the catalog.
+    Querysets are consumed from a no-cache cursor so only one object is held in memory at once.
+    """
+    catalog_uri = URIRef(url_for("api.site_rdf_catalog", _external=True))
+    graph = Graph(namespace_manager=namespace_manager)
+    set_catalog_metadata(site, graph.resource(catalog_uri))
+    yield graph
+
+    for dataset in datasets.no_cache():
+        graph = Graph(namespace_manager=namespace_manager)
+        add_catalog_dataset(graph.resource(catalog_uri), dataset)
+        yield graph
+
+    for dataservice in dataservices.no_cache():
+        graph = Graph(namespace_manager=namespace_manager)
+        graph.resource(catalog_uri).add(DCAT.service, dataservice_to_rdf(dataservice, graph))
+        yield graph
+
+
+def catalog_page_cache_key(format, page, page_size, tag=None):
+    return f"{CATALOG_CACHE_KEY}:page:{format}:{page}:{page_size}:{tag or ''}"
+
+
+def catalog_page_etag(site, key, total, dataset_ids, dataservice_ids, organization_ids=()):
+    """
+    Fingerprint a catalog page from its content identifiers and their versions.
+
+    The fingerprint changes whenever a dataset or dataservice of the page
+    is added, removed, saved or deleted, or one of their organizations
+    is saved or deleted, without loading any of them.
+    """
+    ids = [str(id) for id in (*dataset_ids, *dataservice_ids, *sorted(organization_ids))]
+    versions = cache.get_many(*[catalog_version_key(id) for id in ids]) if ids else []
+    fingerprint = hashlib.sha1(f"{key}:{site.title}:{total}".encode("utf-8"))
+    for id, version in zip(ids, versions):
+        fingerprint.update(f":{id}@{version}".encode("utf-8"))
+    return fingerprint.hexdigest()
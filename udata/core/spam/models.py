@@ -1,3 +1,6 @@
+import re
+from functools import lru_cache
+
 from flask import current_app
 from langdetect import detect
 from mongoengine import signals
@@ -8,6 +11,22 @@ from .constants import NO_SPAM, NOT_CHECKED, POTENTIAL_SPAM, SPAM_STATUS_CHOICES
 from .signals import on_new_potential_spam
 
 
+@lru_cache(maxsize=8)
+def spam_words_matcher(words: tuple[str]) -> re.Pattern:
+    """
+    A single regex matching any of the spam `words`.
+
+    It is cached so it's only compiled once per `SPAM_WORDS` configuration.
+    """
+    return re.compile("|".join(re.escape(word) for word in words))
+
+
+@lru_cache(maxsize=1024)
+def detect_lang(text: str) -> str:
+    """Language detection memoized by text, as it is costly and texts are often checked again"""
+    return detect(text)
+
+
 class SpamInfo(db.EmbeddedDocument):
     status = db.StringField(choices=SPAM_STATUS_CHOICES, default=NOT_CHECKED)
     callbacks = db.DictField(default={})
@@ -30,6 +49,15 @@ class SpamMixin(object):
     def spam_words():
         return current_app.config.get("SPAM_WORDS", [])
 
+    @staticmethod
+    def find_spam_word(text):
+        """Return the first configured spam word contained in `text` if any"""
+        words = tuple(SpamMixin.spam_words())
+        if not words or not spam_words_matcher(words).search(text):
+            return
+        # Report the first matching word in configuration order
+        return next(word for word in words if word in text)
+
     @staticmethod
     def allowed_langs():
         return current_app.config.get("SPAM_ALLOWED_LANGS", [])
@@ -87,20 +115,20 @@ class SpamMixin(object):
             if before == text and not self.is_new():
                 continue
 
-            for word in SpamMixin.spam_words():
-                if word in text.lower():
-                    self.spam.status = POTENTIAL_SPAM
-                    self._report(
-                        text=text, breadcrumb=breadcrumb, reason=f'contains spam words "{word}"'
-                    )
-                    return
+            word = SpamMixin.find_spam_word(text.lower())
+            if word is not None:
+                self.spam.status = POTENTIAL_SPAM
+                self._report(
+                    text=text, breadcrumb=breadcrumb, reason=f'contains spam words "{word}"'
+                )
+                return
 
             # Language detection is not working well with texts of a few words.
             if (
                 SpamMixin.allowed_langs()
                 and len(text) > SpamMixin.minimum_string_length_for_lang_check()
             ):
-                lang = detect(text.lower())
+                lang = detect_lang(text.lower())
                 if lang not in SpamMixin.allowed_langs():
                     self.spam.status = POTENTIAL_SPAM
                     self._report(
@@ -25,3 +25,15 @@ class SpamTest(TestCase):
         model = TestModel(text="DONNEES DE RECENSEMENT - MARCHES PUBLICS")
         model.detect_spam()
         self.assertNotEqual(model.spam.status, POTENTIAL_SPAM)
+
+    @pytest.mark.options(SPAM_WORDS=["viagra", "casino", "a.b"])
+    def test_find_spam_word(self):
+        assert SpamMixin.find_spam_word("best casino and viagra") == "viagra"
+        assert SpamMixin.find_spam_word("axb is not a.b") == "a.b"
+        assert SpamMixin.find_spam_word("nothing to see") is None
+
+    @pytest.mark.options(SPAM_WORDS=["spam"])
+    def test_spam_word_detected(self):
+        model = TestModel(text="This is some SPAM")
+        model.detect_spam()
+        self.assertEqual(model.spam.status, POTENTIAL_SPAM)
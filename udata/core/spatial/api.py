@@ -1,7 +1,6 @@
 import re
 
 from flask_restx import inputs
-from mongoengine.queryset.visitor import Q
 
 from udata.api import API, api
 from udata.core.dataset.api_fields import dataset_ref_fields
@@ -52,14 +51,9 @@ class SuggestZonesAPI(API):
     @api.expect(suggest_parser)
     @api.doc("suggest_zones")
     def get(self):
-        """Geospatial zones suggest endpoint using mongoDB contains"""
+        """Geospatial zones suggest endpoint using an in-memory prefix index"""
         args = suggest_parser.parse_args()
-        geozones = GeoZone.objects(Q(name__icontains=args["q"]) | Q(code__icontains=args["q"]))
-
-        # We're manually sorting based on zone level int (cause we don't have the int value directly in mongo document)
-        level_id_to_int_level = {level.id: level.admin_level for level in GeoLevel.objects()}
-        geozones = sorted(geozones, key=lambda zone: level_id_to_int_level[zone.level])
-
+        geozones = GeoZone.index().suggest(args["q"], args["size"])
         return [
             {
                 "id": geozone.id,
@@ -68,7 +62,7 @@ class SuggestZonesAPI(API):
                 "level": geozone.level,
                 "uri": geozone.uri,
             }
-            for geozone in geozones[: args["size"]]
+            for geozone in geozones
         ]
 
 
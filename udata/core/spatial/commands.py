@@ -137,6 +137,8 @@ def load(geozones_file, levels_file, drop=False):
         with handle_error():
             total = load_zones(GeoZone, json_geozones)
     log.info("Loaded {total} zones".format(total=total))
+    # Zones are upserted without signals
+    GeoZone.invalidate_index(GeoZone)
 
     log.info("Clean removed geozones in datasets")
     count = fixup_removed_geozone()
@@ -1,4 +1,7 @@
+import time
+
 from flask import current_app
+from mongoengine.signals import post_delete, post_save
 from werkzeug.local import LocalProxy
 from werkzeug.utils import cached_property
 
@@ -11,9 +14,15 @@ from udata.uris import endpoint_for
 
 from . import geoids
 from .constants import ADMIN_LEVEL_MAX, ADMIN_LEVEL_MIN, BASE_GRANULARITIES
+from .suggest import Zone, ZoneIndex
 
 __all__ = ("GeoLevel", "GeoZone", "SpatialCoverage", "spatial_granularities")
 
+ZONES_INDEX_VERSION_KEY = "geozones-index-version"
+
+# Process-local `(version, ZoneIndex)` used by zones and territories suggestions
+_zones_index = (None, None)
+
 
 class GeoLevel(db.Document):
     id = db.StringField(primary_key=True)
@@ -109,6 +118,40 @@ class GeoZone(WithMetrics, db.Document):
         self.metrics["datasets"] = Dataset.objects(spatial__zones=self.id).visible().count()
         self.save()
 
+    @classmethod
+    def index(cls) -> ZoneIndex:
+        """
+        The process-local index of all zones.
+
+        It is rebuilt when the shared index version changes on zone or level save or deletion.
+        Without a cached version (ie. a null cache), it is rebuilt on each call.
+        """
+        global _zones_index
+        version = cache.get(ZONES_INDEX_VERSION_KEY)
+        if version is None:
+            cache.add(ZONES_INDEX_VERSION_KEY, time.time())
+            version = cache.get(ZONES_INDEX_VERSION_KEY)
+        if version is None or _zones_index[0] != version:
+            zones = (
+                Zone(
+                    z["_id"],
+                    z.get("slug"),
+                    z.get("name"),
+                    z.get("code"),
+                    z.get("level"),
+                    z.get("uri"),
+                )
+                for z in cls.objects.only(*Zone._fields).no_cache().as_pymongo()
+            )
+            admin_levels = {level.id: level.admin_level for level in GeoLevel.objects}
+            _zones_index = (version, ZoneIndex(zones, admin_levels))
+        return _zones_index[1]
+
+    @classmethod
+    def invalidate_index(cls, sender, document=None, **kwargs):
+        """Change the zones index version so every process rebuilds its index"""
+        cache.set(ZONES_INDEX_VERSION_KEY, time.time())
+
     def toGeoJSON(self):
         return {
             "id": self.id,
@@ -176,3 +219,9 @@ class SpatialCoverage(db.EmbeddedDocument):
         if "zones" in self._get_changed_fields():
             if self.geom:
                 raise db.ValidationError("The spatial coverage already has a Geometry")
+
+
+post_save.connect(GeoZone.invalidate_index, sender=GeoZone)
+post_delete.connect(GeoZone.invalidate_index, sender=GeoZone)
+post_save.connect(GeoZone.invalidate_index, sender=GeoLevel)
+post_delete.connect(GeoZone.invalidate_index, sender=GeoLevel)
@@ -0,0 +1,88 @@
+"""
+In-memory prefix index used to suggest geozones and territories.
+
+Zones names and codes are normalized (lower cased and without accents)
+and kept in sorted arrays so suggestions are resolved with binary searches
+instead of scanning the whole collection with regular expressions.
+"""
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from .constants import ADMIN_LEVEL_MAX
+
+WORD_START = re.compile(r"\b\w")
+
+Zone = namedtuple("Zone", ("id", "slug", "name", "code", "level", "uri"))
+
+
+def normalize(text):
+    """Lower case `text` and strip its accents"""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold().strip()
+
+
+class PrefixIndex(object):
+    """Normalized keys, each associated to a value, sorted to be searched by prefix"""
+
+    def __init__(self, items):
+        items = sorted(items)
+        self.keys = [key for key, _ in items]
+        self.values = [value for _, value in items]
+
+    def exact(self, key):
+        return self.values[bisect_left(self.keys, key) : bisect_right(self.keys, key)]
+
+    def prefixed(self, prefix):
+        for idx in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[idx].startswith(prefix):
+                break
+            yield self.values[idx]
+
+
+class ZoneIndex(object):
+    """
+    Index of zones names and codes.
+
+    Zones are expected in their database natural order
+    and `admin_levels` maps levels identifiers to their administrative level.
+    """
+
+    def __init__(self, zones, admin_levels):
+        self.zones = list(zones)
+        self.admin_levels = admin_levels
+        names = [normalize(zone.name) for zone in self.zones]
+        self.names = PrefixIndex((name, position) for position, name in enumerate(names))
+        self.words = PrefixIndex(
+            (name[match.start() :], position)
+            for position, name in enumerate(names)
+            for match in WORD_START.finditer(name)
+        )
+        self.codes = PrefixIndex(
+            (normalize(zone.code), position) for position, zone in enumerate(self.zones)
+        )
+
+    def rank(self, position):
+        """Biggest zones (lowest administrative level) first, then in natural order"""
+        level = self.zones[position].level
+        return (self.admin_levels.get(level, ADMIN_LEVEL_MAX), position)
+
+    def suggest(self, text, size):
+        """The `size` top ranked zones with a name word or a code starting with `text`"""
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        positions = set(self.words.prefixed(prefix))
+        positions.update(self.codes.prefixed(prefix))
+        return [self.zones[position] for position in heapq.nsmallest(size, positions, self.rank)]
+
+    def matching(self, level, code=None, prefix=None):
+        """Positions of `level` zones with the exact `code` or a name starting with `prefix`"""
+        if code is not None:
+            positions = self.codes.exact(normalize(code))
+        else:
+            positions = self.names.prefixed(normalize(prefix))
+        return {position for position in positions if self.zones[position].level == level}
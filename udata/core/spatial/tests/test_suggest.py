@@ -0,0 +1,42 @@
+from ..suggest import Zone, ZoneIndex, normalize
+
+
+def zone(id, name, code, level="fr:commune"):
+    return Zone(id, name.lower(), name, code, level, None)
+
+
+class ZoneIndexTest:
+    def test_normalize(self):
+        assert normalize(" Bouches-du-Rhône ") == "bouches-du-rhone"
+
+    def test_suggest_on_name_words_and_code(self):
+        arles = zone("fr:commune:13004", "Arles", "13004")
+        arles_sur_tech = zone("fr:commune:66009", "Arles-sur-Tech", "66009")
+        sarlat = zone("fr:commune:24520", "Sarlat-la-Canéda", "24520")
+        index = ZoneIndex([arles, arles_sur_tech, sarlat], {})
+
+        assert index.suggest("arles", 10) == [arles, arles_sur_tech]
+        assert index.suggest("TECH", 10) == [arles_sur_tech]
+        assert index.suggest("caneda", 10) == [sarlat]
+        assert index.suggest("1300", 10) == [arles]
+        assert index.suggest("rles", 10) == []
+        assert index.suggest("", 10) == []
+
+    def test_suggest_top_levels_first(self):
+        region = zone("fr:region:93", "Provence", "93", level="fr:region")
+        town = zone("fr:commune:83100", "Provence town", "83100")
+        index = ZoneIndex([town, region], {"fr:region": 40, "fr:commune": 80})
+
+        assert index.suggest("prov", 10) == [region, town]
+        assert index.suggest("prov", 1) == [region]
+
+    def test_matching(self):
+        county = zone("fr:departement:13", "Bouches-du-Rhône", "13", level="fr:departement")
+        town = zone("fr:commune:26054", "Bouchet", "26054")
+        index = ZoneIndex([county, town], {})
+
+        assert index.matching("fr:departement", code="13") == {0}
+        assert index.matching("fr:commune", code="13") == set()
+        assert index.matching("fr:departement", prefix="bouche") == {0}
+        assert index.matching("fr:commune", prefix="bouche") == {1}
+        assert index.matching("fr:commune", prefix="du-rhone") == set()
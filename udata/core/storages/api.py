@@ -1,7 +1,9 @@
+import hashlib
 import os
 from datetime import datetime
 
 from flask import json
+from flask_storage.files import mime
 from werkzeug.datastructures import FileStorage
 
 from udata.api import api, fields
@@ -115,21 +117,42 @@ def combine_chunks(storage, args, prefix=None):
     """
     Combine a chunked file into a whole file again.
     Goes through each part, in order,
-    and appends that part's bytes to another destination file.
+    and streams that part's bytes to another destination file,
+    computing the whole file checksum and size along the way.
     Chunks are stored in the chunks storage.
+    Return the destination filename and its `checksum` and `size` metadata.
     """
     uuid = args["uuid"]
     # Normalize filename including extension
     target = utils.normalize(args["filename"])
     if prefix:
         target = os.path.join(prefix, target)
+    hasher = hashlib.sha1()
+    size = 0
     with storage.open(target, "wb") as out:
         for i in range(args["totalparts"]):
             partname = chunk_filename(uuid, i)
-            out.write(chunks.read(partname))
+            with chunks.open(partname, "rb") as part:
+                size += utils.copy(part, out, hasher)
             chunks.delete(partname)
     chunks.delete(chunk_filename(uuid, META))
-    return target
+    return target, {"checksum": "sha1:{0}".format(hasher.hexdigest()), "size": size}
+
+
+def combined_metadata(storage, filename, metadata):
+    """
+    Complete the metadata computed while combining chunks
+    without reading the combined file again.
+    """
+    metadata.update(
+        {
+            "filename": os.path.basename(filename),
+            "url": storage.url(filename, external=True),
+            "mime": mime(filename, "application/octet-stream"),
+            "modified": datetime.utcnow(),
+        }
+    )
+    return metadata
 
 
 def handle_upload(storage, prefix=None):
@@ -141,15 +164,16 @@ def handle_upload(storage, prefix=None):
         if uploaded_file:
             save_chunk(uploaded_file, args)
         else:
-            fs_filename = combine_chunks(storage, args, prefix=prefix)
+            fs_filename, metadata = combine_chunks(storage, args, prefix=prefix)
+            metadata = combined_metadata(storage, fs_filename, metadata)
     elif not uploaded_file:
         raise UploadError("Missing file parameter")
     else:
         # Normalize filename including extension
         filename = utils.normalize(uploaded_file.filename)
         fs_filename = storage.save(uploaded_file, prefix=prefix, filename=filename)
+        metadata = storage.metadata(fs_filename)
 
-    metadata = storage.metadata(fs_filename)
     metadata["last_modified_internal"] = metadata.pop("modified")
     metadata["fs_filename"] = fs_filename
     checksum = metadata.pop("checksum")
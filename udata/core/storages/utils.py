@@ -22,6 +22,24 @@ def hash(file, hasher):
     return hasher.hexdigest()
 
 
+def copy(source, destination, *hashers):
+    """
+    Copy a file content into another by fixed-size blocks,
+    feeding each block to the given `hashers` on the fly.
+    Return the number of copied bytes.
+    """
+    size = 0
+    while True:
+        data = source.read(CHUNK_SIZE)
+        if not data:
+            break
+        destination.write(data)
+        for hasher in hashers:
+            hasher.update(data)
+        size += len(data)
+    return size
+
+
 def sha1(file):
     """Perform a SHA1 digest on file"""
     return hash(file, hashlib.sha1())
@@ -1,5 +1,11 @@
 import logging
 
+from mongoengine.signals import post_delete, post_save, pre_save
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from udata.core.dataset.models import Dataset
+from udata.core.reuse.models import Reuse
 from udata.mongo import db
 
 log = logging.getLogger(__name__)
@@ -7,11 +13,17 @@ log = logging.getLogger(__name__)
 
 __all__ = ("Tag",)
 
+#: Tagged models by their `Tag.counts` key
+TAGGED = {
+    "datasets": Dataset,
+    "reuses": Reuse,
+}
+
 
 class Tag(db.Document):
     """
-    This collection is auto-populated every hour map-reducing tag properties
-    from Datasets dans Reuses.
+    This collection is kept up to date incrementally on tagged objects save and deletion,
+    and periodically reconciled with a full recount of tag properties from Datasets and Reuses.
     """
 
     name = db.StringField(required=True, unique=True)
@@ -27,3 +39,66 @@ class Tag(db.Document):
 
     def clean(self):
         self.total = sum(self.counts.values())
+
+    @classmethod
+    def increment_counts(cls, key, increments):
+        """
+        Apply `increments` (count deltas by tag name) to the `key` counts
+        with a single bulk write, creating missing tags.
+        """
+        operations = [
+            UpdateOne(
+                {"name": name}, {"$inc": {f"counts.{key}": delta, "total": delta}}, upsert=True
+            )
+            for name, delta in increments.items()
+            if delta
+        ]
+        if operations:
+            cls._get_collection().bulk_write(operations, ordered=False)
+
+
+def tagged_key(document):
+    for key, model in TAGGED.items():
+        if isinstance(document, model):
+            return key
+
+
+def normalized_tags(document, tags):
+    return set(document._fields["tags"].clean(tags or []))
+
+
+def update_tags_counts(document, previous, current):
+    increments = {tag: 1 for tag in current - previous}
+    increments.update({tag: -1 for tag in previous - current})
+    try:
+        Tag.increment_counts(tagged_key(document), increments)
+    except PyMongoError:
+        # Counts will be fixed by the next full recount
+        log.exception("Unable to update tags counts for %r", document)
+
+
+def tags_pre_save(sender, document, **kwargs):
+    """Fetch the saved tags before the new ones erase them"""
+    if document.pk and "tags" in document._get_changed_fields():
+        document._previous_tags = sender.objects(pk=document.pk).scalar("tags").first()
+
+
+def tags_post_save(sender, document, **kwargs):
+    if kwargs.get("created"):
+        previous = set()
+    elif hasattr(document, "_previous_tags"):
+        previous = normalized_tags(document, document._previous_tags)
+        del document._previous_tags
+    else:
+        return
+    update_tags_counts(document, previous, normalized_tags(document, document.tags))
+
+
+def tags_post_delete(sender, document, **kwargs):
+    update_tags_counts(document, normalized_tags(document, document.tags), set())
+
+
+for model in TAGGED.values():
+    pre_save.connect(tags_pre_save, sender=model)
+    post_save.connect(tags_post_save, sender=model)
+    post_delete.connect(tags_post_delete, sender=model)
@@ -1,43 +1,57 @@
 import logging
+from collections import defaultdict
+
+from pymongo import UpdateOne
 
-from udata.models import Dataset, Reuse
 from udata.tasks import job
+from udata.utils import batched
 
-from .models import Tag
+from .models import TAGGED, Tag
 
 log = logging.getLogger(__name__)
 
-map_tags = """
-function() {
-    this.tags.forEach(function(tag) {
-        emit(tag, 1);
-    });
-}
-"""
-
-reduce_tags = """
-function(key, values) {
-    var total = 0;
-    for(var i = 0; i < values.length; i++) {
-        total += values[i];
-    }
-    return total;
-}
-"""
+BULK_SIZE = 1000
 
-TAGGED = {
-    "datasets": Dataset,
-    "reuses": Reuse,
-}
+
+def aggregate_tags(model):
+    """Count each tag occurences among a model objects"""
+    pipeline = [
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+    ]
+    return {
+        row["_id"]: row["count"] for row in model.objects(tags__exists=True).aggregate(pipeline)
+    }
 
 
 @job("count-tags")
 def count_tags(self):
-    """Count tag occurences by type and update the tag collection"""
+    """
+    Count tag occurences by type and reconcile the tag collection.
+
+    Counts are maintained incrementally on save, this full recount
+    only fixes drifts (ie. from bulk updates bypassing signals).
+    """
+    counts = defaultdict(lambda: dict.fromkeys(TAGGED, 0))
     for key, model in TAGGED.items():
-        collection = "{0}_tags".format(key)
-        results = model.objects(tags__exists=True).map_reduce(map_tags, reduce_tags, collection)
-        for result in results:
-            tag, created = Tag.objects.get_or_create(name=result.key, auto_save=False)
-            tag.counts[key] = int(result.value) if result.value else 0
-            tag.save()
+        for tag, count in aggregate_tags(model).items():
+            counts[tag][key] = count
+
+    collection = Tag._get_collection()
+    operations = (
+        UpdateOne(
+            {"name": name},
+            {"$set": {"counts": tag_counts, "total": sum(tag_counts.values())}},
+            upsert=True,
+        )
+        for name, tag_counts in counts.items()
+    )
+    for chunk in batched(operations, BULK_SIZE):
+        collection.bulk_write(chunk, ordered=False)
+
+    # Tags which are not used anymore
+    stale = (name for name in Tag.objects.order_by("name").scalar("name") if name not in counts)
+    empty = dict.fromkeys(TAGGED, 0)
+    for chunk in batched(stale, BULK_SIZE):
+        collection.update_many({"name": {"$in": chunk}}, {"$set": {"counts": empty, "total": 0}})
+    log.info("Counted %d tags", len(counts))
@@ -1,6 +1,23 @@
 from udata.core.followers.signals import on_follow, on_unfollow
+from udata.core.metrics.bulk import count_by
+from udata.core.metrics.counters import counter, metrics_queue
 from udata.core.owned import Owned
-from udata.models import Dataset, Reuse, User
+from udata.models import Dataset, Follow, Reuse, User
+
+
+@counter(User, "datasets")
+def count_datasets(users):
+    return count_by(Dataset.objects(owner__in=list(users.scalar("id"))).visible(), "owner")
+
+
+@counter(User, "reuses")
+def count_reuses(users):
+    return count_by(Reuse.objects(owner__in=list(users.scalar("id"))).visible(), "owner")
+
+
+@counter(User, "following")
+def count_following(users):
+    return count_by(Follow.objects(follower__in=list(users.scalar("id")), until=None), "follower")
 
 
 @Dataset.on_create.connect
@@ -8,7 +25,7 @@ from udata.models import Dataset, Reuse, User
 @Dataset.on_delete.connect
 def update_datasets_metrics(document, **kwargs):
     if document.owner:
-        document.owner.count_datasets()
+        metrics_queue.add(document.owner, "datasets")
 
 
 @Reuse.on_create.connect
@@ -16,13 +33,13 @@ def update_datasets_metrics(document, **kwargs):
 @Reuse.on_delete.connect
 def update_reuses_metrics(document, **kwargs):
     if document.owner:
-        document.owner.count_reuses()
+        metrics_queue.add(document.owner, "reuses")
 
 
 @on_follow.connect
 @on_unfollow.connect
 def update_user_following_metric(follow):
-    follow.follower.count_following()
+    metrics_queue.add(follow.follower, "following")
 
 
 @Owned.on_owner_change.connect
@@ -30,6 +47,6 @@ def update_owner_metrics(document, previous):
     if not isinstance(previous, User):
         return
     if isinstance(document, Dataset):
-        previous.count_datasets()
+        metrics_queue.add(previous, "datasets")
     elif isinstance(document, Reuse):
-        previous.count_reuses()
+        metrics_queue.add(previous, "reuses")
@@ -5,9 +5,12 @@ from datetime import date, datetime
 from io import StringIO
 
 from flask import Response, stream_with_context
+from mongoengine.dereference import DeReference
+from mongoengine.queryset import QuerySet
+from mongoengine.queryset.base import BaseQuerySet
 
 from udata.mongo import db
-from udata.utils import recursive_get
+from udata.utils import batched, recursive_get
 
 log = logging.getLogger(__name__)
 
@@ -33,6 +36,11 @@ class Adapter(object):
     """A Base model CSV adapter"""
 
     fields = None
+    # Fields read by callable getters and properties. When set, only them and the
+    # fields read by string getters are loaded from the database (all fields otherwise)
+    extra_projection = None
+    # Number of objects loaded together, with their references
+    batch_size = 1000
 
     def __init__(self, queryset):
         self.queryset = queryset
@@ -73,13 +81,51 @@ class Adapter(object):
             )
         return (lambda o: recursive_get(o, getter)) if isinstance(getter, str) else getter
 
+    def get_projection(self, document):
+        """
+        The `document` fields to load from the database, all of them if None.
+
+        Fields are derived from the first path segment of string getters,
+        those which are not `document` fields are expected to be covered by `extra_projection`.
+        """
+        if self.extra_projection is None:
+            return None
+        projection = set(self.extra_projection)
+        for field in itertools.chain(self.fields, self.dynamic_fields()):
+            name, getter = (field, None) if isinstance(field, str) else field
+            if getter is None and not hasattr(self, "field_{0}".format(name)):
+                getter = name
+            if isinstance(getter, str) and getter.split(".", 1)[0] in document._fields:
+                projection.add(getter.split(".", 1)[0])
+        return sorted(projection)
+
     def header(self):
         """Generate the CSV header row"""
         return [name for name, getter in self.get_fields()]
 
+    def objects(self):
+        """
+        Iterate over queryset objects by batches.
+
+        Only projected fields are loaded, without caching the queryset,
+        and each batch references are fetched with a single query per referenced model.
+        """
+        if not isinstance(self.queryset, BaseQuerySet):
+            yield from self.queryset
+            return
+        queryset = self.queryset
+        if isinstance(queryset, QuerySet):
+            queryset = queryset.no_cache()
+        queryset = queryset.batch_size(self.batch_size)
+        projection = self.get_projection(queryset._document)
+        if projection:
+            queryset = queryset.only(*projection)
+        for batch in batched(queryset, self.batch_size):
+            yield from DeReference()(batch, max_depth=1)
+
     def rows(self):
         """Iterate over queryset objects"""
-        return (self.to_row(o) for o in self.queryset)
+        return (self.to_row(o) for o in self.objects())
 
     def to_row(self, obj):
         """Convert an object into a flat csv row"""
@@ -117,6 +163,12 @@ class NestedAdapter(Adapter):
             name for name, getter in self.get_nested_fields()
         ]
 
+    def get_projection(self, document):
+        projection = super(NestedAdapter, self).get_projection(document)
+        if projection is None:
+            return None
+        return sorted(set(projection) | {self.attribute})
+
     def get_nested_fields(self):
         if not self._nested_fields:
             if not isinstance(self.nested_fields, (list, tuple)):
@@ -145,12 +197,12 @@ class NestedAdapter(Adapter):
         return self._nested_fields
 
     def get_queryset(self):
-        return ((o, n) for o in self.queryset for n in getattr(o, self.attribute))
+        return ((o, n) for o in self.objects() for n in getattr(o, self.attribute))
 
     def rows(self):
         """Iterate over queryset objects"""
         return (
-            self.nested_row(o, n) for o in self.queryset for n in getattr(o, self.attribute, [])
+            self.nested_row(o, n) for o in self.objects() for n in getattr(o, self.attribute, [])
         )
 
     def nested_row(self, obj, nested):
@@ -207,6 +259,13 @@ def get_reader(infile):
     return csv.reader(infile, **CONFIG)
 
 
+def write(adapter, out):
+    """Write an adapter header and rows to a text file-like object"""
+    writer = get_writer(out)
+    writer.writerow(adapter.header())
+    writer.writerows(adapter.rows())
+
+
 def yield_rows(adapter):
     """Yield a dataset catalog line by line"""
     csvfile = StringIO()
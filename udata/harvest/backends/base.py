@@ -1,6 +1,10 @@
 import logging
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
+from functools import cached_property
+from queue import Full, Queue
 from uuid import UUID
 
 import requests
@@ -13,6 +17,7 @@ from udata.core.dataset.models import HarvestDatasetMetadata
 from udata.models import Dataset
 from udata.utils import safe_unicode
 
+from ..cache import PageCache
 from ..exceptions import HarvestException, HarvestSkipException, HarvestValidationError
 from ..models import (
     HarvestError,
@@ -25,6 +30,8 @@ from ..signals import after_harvest_job, before_harvest_job
 
 log = logging.getLogger(__name__)
 
+MISSING = object()
+
 # Disable those annoying warnings
 requests.packages.urllib3.disable_warnings()
 
@@ -108,25 +115,110 @@ class BaseBackend(object):
             self.job = None
         self.dryrun = dryrun
         self.max_items = max_items or current_app.config["HARVEST_MAX_ITEMS"]
+        # Number of job items already persisted
+        self.saved_items = len(self.job.items) if self.job else 0
+        # Prefetched local objects by model then remote ID, see `prefetch_existing`
+        self.existing = {}
 
     @property
     def config(self):
         return self.source.config
 
-    def head(self, url, headers={}, **kwargs):
-        headers.update(self.get_headers())
+    @cached_property
+    def session(self):
+        """A connection pooling session shared by all the job requests"""
+        return requests.Session()
+
+    def head(self, url, headers=None, **kwargs):
+        headers = {**(headers or {}), **self.get_headers()}
         kwargs["verify"] = kwargs.get("verify", self.verify_ssl)
-        return requests.head(url, headers=headers, **kwargs)
+        return self.session.head(url, headers=headers, **kwargs)
 
-    def get(self, url, headers={}, **kwargs):
-        headers.update(self.get_headers())
+    def get(self, url, headers=None, **kwargs):
+        headers = {**(headers or {}), **self.get_headers()}
         kwargs["verify"] = kwargs.get("verify", self.verify_ssl)
-        return requests.get(url, headers=headers, **kwargs)
+        return self.session.get(url, headers=headers, **kwargs)
 
-    def post(self, url, data, headers={}, **kwargs):
-        headers.update(self.get_headers())
+    def post(self, url, data, headers=None, **kwargs):
+        headers = {**(headers or {}), **self.get_headers()}
         kwargs["verify"] = kwargs.get("verify", self.verify_ssl)
-        return requests.post(url, data=data, headers=headers, **kwargs)
+        return self.session.post(url, data=data, headers=headers, **kwargs)
+
+    @property
+    def page_cache(self):
+        root = current_app.config["HARVEST_PAGE_CACHE_DIR"]
+        return PageCache(root) if root else None
+
+    def get_page(self, url):
+        """
+        Fetch a remote page content.
+
+        With `HARVEST_PAGE_CACHE_DIR`, a page fetched by a previous job is revalidated
+        with a conditional request and read from the cache if it did not change.
+        """
+        cache = self.page_cache
+        headers = cache.headers(url) if cache else {}
+        response = self.get(url, headers=headers)
+        if headers and response.status_code == 304:
+            log.debug(f"Page {url} did not change, using cached content")
+            return cache.read(url)
+        response.raise_for_status()
+        if cache:
+            cache.write(url, response)
+        return response.text
+
+    def prefetch(self, pages):
+        """
+        Consume the `pages` iterable in a background thread,
+        keeping up to `HARVEST_PREFETCH_PAGES` pages fetched and parsed in a bounded queue
+        while the current page is processed.
+        Errors raised while fetching pages, including `BaseException`,
+        are raised back to the consumer.
+        """
+        size = current_app.config["HARVEST_PREFETCH_PAGES"]
+        if not size:
+            yield from pages
+            return
+
+        app = current_app._get_current_object()
+        queue = Queue(maxsize=size)
+        stop = threading.Event()
+
+        def put(kind, value=None):
+            while not stop.is_set():
+                try:
+                    queue.put((kind, value), timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def produce():
+            end = ("done", None)
+            try:
+                with app.app_context():
+                    for page in pages:
+                        if not put("page", page):
+                            return
+            except BaseException as e:
+                end = ("error", e)
+            finally:
+                # Always signal the end of pages, otherwise the consumer would wait forever
+                put(*end)
+
+        producer = threading.Thread(target=produce, name="harvest-prefetch", daemon=True)
+        producer.start()
+        try:
+            while True:
+                kind, value = queue.get()
+                if kind == "error":
+                    raise value
+                if kind == "done":
+                    return
+                yield value
+        finally:
+            stop.set()
+            producer.join()
 
     def get_headers(self):
         return {
@@ -164,6 +256,8 @@ class BaseBackend(object):
         log.debug(f"Starting harvesting {self.source.name} ({self.source.url})…")
         factory = HarvestJob if self.dryrun else HarvestJob.objects.create
         self.job = factory(status="initialized", started=datetime.utcnow(), source=self.source)
+        self.saved_items = 0
+        self.existing = {}
 
         before_harvest_job.send(self)
 
@@ -201,17 +295,67 @@ class BaseBackend(object):
         return self.job
 
     def process_dataset(self, remote_id: str, **kwargs):
+        item = self.add_dataset_item(remote_id)
+        self.process_dataset_item(item, **kwargs)
+        self.save_items()
+
+    def process_datasets(self, records):
+        """
+        Process `(remote_id, kwargs)` dataset records until `max_items` is reached.
+
+        Existing datasets of all records are fetched at once beforehand.
+
+        With `HARVEST_WORKERS` greater than 1, datasets are converted and saved
+        concurrently by a pool of threads, records sharing a remote id being processed
+        sequentially by a same thread. Items are added to the job in records order
+        whatever their processing order, so the job report stays deterministic.
+        """
+        records = list(records)
+        self.prefetch_existing(Dataset, [remote_id for remote_id, _ in records])
+
+        workers = current_app.config["HARVEST_WORKERS"]
+        if workers <= 1:
+            for remote_id, kwargs in records:
+                if self.is_done():
+                    return
+                self.process_dataset(remote_id, **kwargs)
+            return
+
+        app = current_app._get_current_object()
+
+        def process(items):
+            with app.app_context():
+                for item, kwargs in items:
+                    self.process_dataset_item(item, **kwargs)
+
+        # Records sharing a remote id are processed in order by the same worker,
+        # otherwise each of them could create its own dataset
+        groups = {}
+        for remote_id, kwargs in records:
+            if self.is_done():
+                break
+            item = self.add_dataset_item(remote_id)
+            groups.setdefault(str(remote_id), []).append((item, kwargs))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process, items) for items in groups.values()]
+            for future in futures:
+                future.result()
+        self.save_items()
+
+    def add_dataset_item(self, remote_id: str) -> HarvestItem:
         log.debug(f"Processing dataset {remote_id}…")
 
         # TODO add `type` to `HarvestItem` to differentiate `Dataset` from `Dataservice`
         item = HarvestItem(status="started", started=datetime.utcnow(), remote_id=remote_id)
         self.job.items.append(item)
-        self.save_job()
+        return item
 
+    def process_dataset_item(self, item: HarvestItem, **kwargs):
         log_catcher = LogCatcher()
 
         try:
-            if not remote_id:
+            if not item.remote_id:
                 raise HarvestSkipException("missing identifier")
 
             current_app.logger.addHandler(log_catcher)
@@ -252,7 +396,6 @@ class BaseBackend(object):
                 HarvestLog(level=record.levelname, message=record.getMessage())
                 for record in log_catcher.records
             ]
-            self.save_job()
 
     def is_done(self) -> bool:
         """Should be called after process_dataset to know if we reach the max items"""
@@ -268,7 +411,6 @@ class BaseBackend(object):
         # TODO add `type` to `HarvestItem` to differentiate `Dataset` from `Dataservice`
         item = HarvestItem(status="started", started=datetime.utcnow(), remote_id=remote_id)
         self.job.items.append(item)
-        self.save_job()
 
         try:
             if not remote_id:
@@ -307,7 +449,7 @@ class BaseBackend(object):
             item.errors.append(error)
         finally:
             item.ended = datetime.utcnow()
-            self.save_job()
+            self.save_items()
 
     def update_dataset_harvest_info(self, harvest: HarvestDatasetMetadata | None, remote_id: int):
         if not harvest:
@@ -345,13 +487,36 @@ class BaseBackend(object):
         return harvest
 
     def save_job(self):
-        if not self.dryrun:
-            self.job.save()
+        """
+        Persist the job progress.
+
+        Items added since the last save are appended with a single `$push`
+        and the other fields are updated in place, so the cost of a save
+        does not grow with the number of items already saved.
+        """
+        if self.dryrun:
+            return
+        update = {
+            f"set__{name}": self.job[name]
+            for name in ("status", "started", "ended", "errors", "data")
+        }
+        new_items = self.job.items[self.saved_items :]
+        if new_items:
+            update["push__items"] = list(new_items)
+        HarvestJob.objects(id=self.job.id).update_one(**update)
+        self.saved_items = len(self.job.items)
+
+    def save_items(self):
+        """Save the job once `HARVEST_JOB_SAVE_BATCH_SIZE` items have been added since the last save"""
+        if (
+            len(self.job.items) - self.saved_items
+            >= current_app.config["HARVEST_JOB_SAVE_BATCH_SIZE"]
+        ):
+            self.save_job()
 
     def end_job(self):
         self.job.ended = datetime.utcnow()
-        if not self.dryrun:
-            self.job.save()
+        self.save_job()
 
         after_harvest_job.send(self)
 
@@ -382,21 +547,50 @@ class BaseBackend(object):
                 )
             )
 
-            self.save_job()
+            self.save_items()
 
-    def get_dataset(self, remote_id):
-        """Get or create a dataset given its remote ID (and its source)
+    def harvested_query(self, remote_id):
+        """
+        Raw query matching the objects harvested from this source with a given remote ID
         We first try to match `source_id` to be source domain independent
         """
-        dataset = Dataset.objects(
-            __raw__={
-                "harvest.remote_id": remote_id,
-                "$or": [
-                    {"harvest.domain": self.source.domain},
-                    {"harvest.source_id": str(self.source.id)},
-                ],
-            }
-        ).first()
+        return {
+            "harvest.remote_id": remote_id,
+            "$or": [
+                {"harvest.domain": self.source.domain},
+                {"harvest.source_id": str(self.source.id)},
+            ],
+        }
+
+    def prefetch_existing(self, model, remote_ids):
+        """
+        Fetch in a single query the local `model` objects harvested from `remote_ids`
+        (typically a page of remote records) for the next `get_existing` calls.
+        """
+        remote_ids = [str(remote_id) for remote_id in remote_ids if remote_id]
+        existing = self.existing[model] = dict.fromkeys(remote_ids)
+        if not remote_ids:
+            return
+        objects = model.objects(__raw__=self.harvested_query({"$in": remote_ids}))
+        for obj in objects.no_cache():
+            # Keep the first match in model ordering like `.first()` does
+            if existing[obj.harvest.remote_id] is None:
+                existing[obj.harvest.remote_id] = obj
+
+    def get_existing(self, model, remote_id):
+        """
+        Get the local `model` object harvested from `remote_id` if any,
+        from the prefetched objects when available.
+        """
+        # Prefetched objects are only used once as the first lookup may create them
+        obj = self.existing.get(model, {}).pop(str(remote_id), MISSING)
+        if obj is MISSING:
+            obj = model.objects(__raw__=self.harvested_query(remote_id)).first()
+        return obj
+
+    def get_dataset(self, remote_id):
+        """Get or create a dataset given its remote ID (and its source)"""
+        dataset = self.get_existing(Dataset, remote_id)
 
         if dataset:
             return dataset
@@ -409,18 +603,8 @@ class BaseBackend(object):
         return Dataset()
 
     def get_dataservice(self, remote_id):
-        """Get or create a dataservice given its remote ID (and its source)
-        We first try to match `source_id` to be source domain independent
-        """
-        dataservice = Dataservice.objects(
-            __raw__={
-                "harvest.remote_id": remote_id,
-                "$or": [
-                    {"harvest.domain": self.source.domain},
-                    {"harvest.source_id": str(self.source.id)},
-                ],
-            }
-        ).first()
+        """Get or create a dataservice given its remote ID (and its source)"""
+        dataservice = self.get_existing(Dataservice, remote_id)
 
         if dataservice:
             return dataservice
@@ -475,11 +659,15 @@ class BaseBackend(object):
 
 
 class LogCatcher(logging.Handler):
+    """Catch the log records emitted by the thread which created it"""
+
     records: list[logging.LogRecord]
 
     def __init__(self):
         self.records = []
+        self.thread = threading.get_ident()
         super().__init__()
 
     def emit(self, record):
-        self.records.append(record)
+        if record.thread == self.thread:
+            self.records.append(record)
@@ -7,6 +7,7 @@ from flask import current_app
 from rdflib import Graph
 from rdflib.namespace import RDF
 
+from udata.core.dataservices.models import Dataservice
 from udata.core.dataservices.rdf import dataservice_from_rdf
 from udata.core.dataset.rdf import dataset_from_rdf
 from udata.harvest.models import HarvestItem
@@ -69,13 +70,22 @@ class DcatBackend(BaseBackend):
         self.job.data = {"format": fmt}
 
         serialized_graphs = []
+        pages = []
 
-        for page_number, page in self.walk_graph(self.source.url, fmt):
+        for page_number, page in self.prefetch(self.walk_graph(self.source.url, fmt)):
+            # Pages are prefetched ahead of `is_done` checks in `walk_graph`
+            if self.is_done():
+                break
             self.process_one_datasets_page(page_number, page)
             serialized_graphs.append(page.serialize(format=fmt, indent=None))
+            pages.append((page_number, page))
 
-        for page_number, page in self.walk_graph(self.source.url, fmt):
+        # Dataservices are linked to the harvested datasets, so they are processed
+        # once all datasets are, from the already fetched and parsed pages.
+        for page_number, page in pages:
             self.process_one_dataservices_page(page_number, page)
+            if self.is_done():
+                break
 
         # The official MongoDB document size in 16MB. The default value here is 15MB to account for other fields in the document (and for difference between * 1024 vs * 1000).
         max_harvest_graph_size_in_mongo = current_app.config.get(
@@ -127,9 +137,7 @@ class DcatBackend(BaseBackend):
         page_number = 0
         while url:
             subgraph = Graph(namespace_manager=namespace_manager)
-            response = self.get(url)
-            response.raise_for_status()
-            data = response.text
+            data = self.get_page(url)
             for old_uri, new_uri in URIS_TO_REPLACE.items():
                 data = data.replace(old_uri, new_uri)
             subgraph.parse(data=data, format=fmt)
@@ -149,15 +157,19 @@ class DcatBackend(BaseBackend):
             page_number += 1
 
     def process_one_datasets_page(self, page_number: int, page: Graph):
-        for node in page.subjects(RDF.type, DCAT.Dataset):
-            remote_id = page.value(node, DCT.identifier)
-            self.process_dataset(remote_id, page_number=page_number, page=page, node=node)
-
-            if self.is_done():
-                return
+        records = (
+            (
+                page.value(node, DCT.identifier),
+                {"page_number": page_number, "page": page, "node": node},
+            )
+            for node in page.subjects(RDF.type, DCAT.Dataset)
+        )
+        self.process_datasets(records)
 
     def process_one_dataservices_page(self, page_number: int, page: Graph):
-        for node in page.subjects(RDF.type, DCAT.DataService):
+        nodes = list(page.subjects(RDF.type, DCAT.DataService))
+        self.prefetch_existing(Dataservice, [page.value(node, DCT.identifier) for node in nodes])
+        for node in nodes:
             remote_id = page.value(node, DCT.identifier)
             self.process_dataservice(remote_id, page_number=page_number, page=page, node=node)
 
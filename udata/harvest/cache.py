@@ -0,0 +1,62 @@
+"""
+On-disk cache of harvested remote pages
+
+Pages are stored with their `ETag` and `Last-Modified` validators
+so the next harvest jobs can revalidate them with conditional requests
+and reuse the local copy of unchanged pages instead of downloading them again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+
+class PageCache(object):
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, url, extension):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, key[:2], f"{key}.{extension}")
+
+    def headers(self, url):
+        """Conditional request headers for a cached page, empty if the page is not cached"""
+        if not os.path.exists(self.path(url, "data")):
+            return {}
+        try:
+            with open(self.path(url, "json")) as f:
+                validators = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def read(self, url):
+        with open(self.path(url, "data"), encoding="utf-8") as f:
+            return f.read()
+
+    def write(self, url, response):
+        """Store a page content if it can be revalidated later"""
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if not any(validators.values()):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path(url, "data")), exist_ok=True)
+            # Content is written before its validators so a page is never revalidated without it
+            for extension, content in (("data", response.text), ("json", json.dumps(validators))):
+                path = self.path(url, extension)
+                with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(f"{path}.tmp", path)
+        except OSError:
+            log.exception("Unable to cache page %s", url)
@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta
+from unittest.mock import Mock
 from urllib.parse import urlparse
 
 import pytest
+from flask import current_app
 from voluptuous import Schema
 
 from udata.core.dataset import tasks
@@ -35,11 +37,10 @@ class FakeBackend(BaseBackend):
     )
 
     def inner_harvest(self):
-        for i in range(self.source.config.get("nb_datasets", 3)):
-            remote_id = f"fake-{i}"
-            self.process_dataset(remote_id)
-            if self.is_done():
-                return
+        nb_datasets = self.source.config.get("nb_datasets", 3)
+        default_ids = [f"fake-{i}" for i in range(nb_datasets)]
+        remote_ids = self.source.config.get("remote_ids", default_ids)
+        self.process_datasets((remote_id, {}) for remote_id in remote_ids)
 
     def inner_process_dataset(self, item: HarvestItem):
         dataset = self.get_dataset(item.remote_id)
@@ -90,6 +91,76 @@ class BaseBackendTest:
             assert dataset.harvest.remote_id.startswith("fake-")
             assert_equal_dates(dataset.harvest.last_update, now)
 
+    @pytest.mark.options(HARVEST_JOB_SAVE_BATCH_SIZE=2)
+    def test_save_items_by_batches(self, mocker):
+        source = HarvestSourceFactory(config={"nb_datasets": 5})
+        backend = FakeBackend(source)
+        save_job = mocker.spy(backend, "save_job")
+
+        job = backend.harvest()
+
+        # Two full batches during processing then the remaining item on job end
+        assert save_job.call_count == 3
+        job.reload()
+        assert job.status == "done"
+        assert job.ended is not None
+        assert [i.remote_id for i in job.items] == [f"fake-{i}" for i in range(5)]
+        assert all(i.status == "done" and i.dataset for i in job.items)
+
+    @pytest.mark.options(HARVEST_WORKERS=4)
+    def test_process_datasets_concurrently(self):
+        source = HarvestSourceFactory(config={"nb_datasets": 10})
+        backend = FakeBackend(source)
+
+        job = backend.harvest()
+
+        assert job.status == "done"
+        assert [i.remote_id for i in job.items] == [f"fake-{i}" for i in range(10)]
+        assert all(i.status == "done" and i.dataset for i in job.items)
+        assert Dataset.objects.count() == 10
+
+    @pytest.mark.options(HARVEST_WORKERS=4, HARVEST_MAX_ITEMS=3)
+    def test_process_datasets_concurrently_with_max_items(self):
+        source = HarvestSourceFactory(config={"nb_datasets": 10})
+        backend = FakeBackend(source)
+
+        job = backend.harvest()
+
+        assert [i.remote_id for i in job.items] == [f"fake-{i}" for i in range(3)]
+        assert Dataset.objects.count() == 3
+
+    @pytest.mark.options(HARVEST_WORKERS=2)
+    def test_process_datasets_concurrently_with_duplicated_remote_id(self):
+        remote_ids = ["fake-0", "fake-1", "fake-0", "fake-2", "fake-0"]
+        source = HarvestSourceFactory(config={"remote_ids": remote_ids})
+        backend = FakeBackend(source)
+
+        job = backend.harvest()
+
+        assert [i.remote_id for i in job.items] == remote_ids
+        assert all(i.status == "done" and i.dataset for i in job.items)
+        assert Dataset.objects.count() == 3
+        assert Dataset.objects(harvest__remote_id="fake-0").count() == 1
+
+    def test_get_dataset_from_prefetched(self, mocker):
+        source = HarvestSourceFactory()
+        backend = FakeBackend(source)
+        existing = DatasetFactory(
+            harvest={"domain": source.domain, "source_id": str(source.id), "remote_id": "fake-1"}
+        )
+        DatasetFactory(harvest={"domain": "other.org", "remote_id": "fake-2"})
+
+        backend.prefetch_existing(Dataset, ["fake-1", "fake-2"])
+        harvested_query = mocker.spy(backend, "harvested_query")
+
+        assert backend.get_dataset("fake-1") == existing
+        assert backend.get_dataset("fake-2").id is None
+        harvested_query.assert_not_called()
+
+        # Prefetched datasets are only used once
+        assert backend.get_dataset("fake-1") == existing
+        harvested_query.assert_called_once_with("fake-1")
+
     def test_has_feature_defaults(self):
         source = HarvestSourceFactory()
         backend = FakeBackend(source)
@@ -358,3 +429,61 @@ class BaseBackendValidateTest:
         assert "[nested.0.other-bad-value] expected int: wrong" in msg
         assert "[nested.1.bad-value] expected str: 43" in msg
         assert "[nested.1.other-bad-value] expected int: bad" in msg
+
+
+class BaseBackendPrefetchTest:
+    @pytest.fixture
+    def backend(self, app):
+        return FakeBackend(Mock(), dryrun=True)
+
+    def test_prefetch_in_order(self, backend):
+        assert list(backend.prefetch(iter(range(10)))) == list(range(10))
+
+    @pytest.mark.options(HARVEST_PREFETCH_PAGES=0)
+    def test_prefetch_disabled(self, backend):
+        pages = iter(range(3))
+        prefetched = backend.prefetch(pages)
+
+        assert next(prefetched) == 0
+        assert next(pages) == 1
+
+    def test_prefetch_raise_errors(self, backend):
+        def pages():
+            yield 1
+            raise ValueError("Failed to fetch")
+
+        prefetched = backend.prefetch(pages())
+
+        assert next(prefetched) == 1
+        with pytest.raises(ValueError, match="Failed to fetch"):
+            next(prefetched)
+
+    def test_prefetch_raise_base_exceptions(self, backend):
+        def pages():
+            yield 1
+            raise KeyboardInterrupt()
+
+        prefetched = backend.prefetch(pages())
+
+        assert next(prefetched) == 1
+        with pytest.raises(KeyboardInterrupt):
+            next(prefetched)
+
+    def test_prefetch_stop_early(self, backend):
+        fetched = []
+
+        def pages():
+            for i in range(100):
+                fetched.append(i)
+                yield i
+
+        for page in backend.prefetch(pages()):
+            break
+
+        assert len(fetched) <= 2 + current_app.config["HARVEST_PREFETCH_PAGES"]
+
+    def test_prefetch_pages_in_app_context(self, backend):
+        def pages():
+            yield current_app.name
+
+        assert list(backend.prefetch(pages())) == [current_app.name]
@@ -0,0 +1,34 @@
+from unittest.mock import Mock
+
+from ..cache import PageCache
+
+URL = "http://data.test.org/catalog.jsonld?page=2"
+
+
+def response(text="content", **headers):
+    return Mock(text=text, headers=headers)
+
+
+class PageCacheTest:
+    def test_not_cached(self, tmpdir):
+        cache = PageCache(str(tmpdir))
+        assert cache.headers(URL) == {}
+
+    def test_write_and_read(self, tmpdir):
+        cache = PageCache(str(tmpdir))
+        cache.write(URL, response("é content", ETag='"v1"', **{"Last-Modified": "yesterday"}))
+
+        assert cache.headers(URL) == {"If-None-Match": '"v1"', "If-Modified-Since": "yesterday"}
+        assert cache.read(URL) == "é content"
+
+    def test_skip_pages_without_validators(self, tmpdir):
+        cache = PageCache(str(tmpdir))
+        cache.write(URL, response())
+
+        assert cache.headers(URL) == {}
+
+    def test_keyed_by_url(self, tmpdir):
+        cache = PageCache(str(tmpdir))
+        cache.write(URL, response(ETag='"v1"'))
+
+        assert cache.headers(URL.replace("page=2", "page=3")) == {}
@@ -53,6 +53,13 @@ def mock_pagination(rmock, path, pattern):
     return url
 
 
+@pytest.fixture
+def page_cache_dir(app, tmp_path, monkeypatch):
+    """Cache harvested pages in a temporary directory"""
+    monkeypatch.setitem(app.config, "HARVEST_PAGE_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
 def mock_csw_pagination(rmock, path, pattern):
     url = DCAT_URL_PATTERN.format(path=path, domain=TEST_DOMAIN)
 
@@ -187,6 +194,41 @@ class DcatBackendTest:
             == "https://data.paris2024.org/api/explore/v2.1/console"
         )
 
+    def test_harvest_fetch_each_page_once(self, rmock):
+        rmock.get("https://example.com/schemas", json=ResourceSchemaMockData.get_mock_data())
+        url = mock_dcat(rmock, "bnodes.xml")
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=OrganizationFactory())
+
+        actions.run(source.slug)
+
+        assert Dataservice.objects.count() == 1
+        assert len([r for r in rmock.request_history if r.url == url]) == 1
+
+    @pytest.mark.usefixtures("page_cache_dir")
+    def test_harvest_revalidate_cached_pages(self, rmock):
+        url = DCAT_URL_PATTERN.format(path="flat.jsonld", domain=TEST_DOMAIN)
+        with open(os.path.join(DCAT_FILES_DIR, "flat.jsonld")) as dcatfile:
+            body = dcatfile.read()
+
+        def callback(request, context):
+            if request.headers.get("If-None-Match") == '"v1"':
+                context.status_code = 304
+                return ""
+            context.headers["ETag"] = '"v1"'
+            return body
+
+        rmock.get(url, text=callback)
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=OrganizationFactory())
+
+        actions.run(source.slug)
+        actions.run(source.slug)
+
+        assert rmock.request_history[-1].headers["If-None-Match"] == '"v1"'
+        job = source.get_last_job()
+        assert job.status == "done"
+        assert len(job.items) == 3
+        assert Dataset.objects.count() == 3
+
     def test_harvest_literal_spatial(self, rmock):
         url = mock_dcat(rmock, "evian.json")
         org = OrganizationFactory()
@@ -436,6 +478,19 @@ class DcatBackendTest:
         job = source.get_last_job()
         assert len(job.items) == 4
 
+    @pytest.mark.options(HARVEST_MAX_ITEMS=3, HARVEST_PREFETCH_PAGES=2)
+    def test_harvest_max_items_with_prefetched_pages(self, rmock):
+        # The first page holds 3 datasets, the second one is prefetched meanwhile
+        url = mock_pagination(rmock, "catalog.jsonld", "partial-collection-{page}.jsonld")
+        org = OrganizationFactory()
+        source = HarvestSourceFactory(backend="dcat", url=url, organization=org)
+
+        actions.run(source.slug)
+
+        job = source.get_last_job()
+        assert len(job.items) == 3
+        assert Dataset.objects.count() == 3
+
     def test_hydra_legacy_paged_collection_pagination(self, rmock):
         url = mock_pagination(rmock, "catalog.jsonld", "paged-collection-{page}.jsonld")
         org = OrganizationFactory()
@@ -2,6 +2,8 @@ from urllib.parse import urlparse
 
 from flask import current_app
 
+from udata.models import Dataset
+
 from .backends import NoCheckLinkchecker
 from .backends import get as get_linkchecker
 
@@ -33,6 +35,21 @@ def is_ignored(resource):
     return ignored_domains_match or ignored_patterns_match
 
 
+def save_check_keys(resource, check_keys):
+    """
+    Store check keys in the resource's extras with a positional update
+    instead of saving its whole dataset, and refresh the dataset quality
+    (with the resource extras already updated) if the availability changed it
+    """
+    dataset = resource.dataset
+    if not dataset:
+        raise RuntimeError("Impossible to save an orphan resource")
+    Dataset.objects(id=dataset.id, resources__id=resource.id).update_one(
+        __raw__={"$set": {f"resources.$.extras.{key}": value for key, value in check_keys.items()}}
+    )
+    dataset.update_quality()
+
+
 def dummy_check_response():
     """Trigger a dummy check"""
     return NoCheckLinkchecker().check(None)
@@ -71,5 +88,5 @@ def check_resource(resource):
     previous_status = resource.extras.get("check:available")
     check_keys = _get_check_keys(result, resource, previous_status)
     resource.extras.update(check_keys)
-    resource.save(signal_kwargs={"ignores": ["post_save"]})  # Prevent signal triggering on dataset
+    save_check_keys(resource, check_keys)
     return result
@@ -16,6 +16,9 @@ def grp():
 
 @grp.command()
 @click.option("-n", "--number", type=int, default=5000, help="Number of URLs to check")
-def check(number):
+@click.option(
+    "-w", "--workers", type=int, help="Number of concurrent checks (LINKCHECKING_WORKERS)"
+)
+def check(number, workers):
     """Check <number> of URLs that have not been (recently) checked"""
-    check_resources(number)
+    check_resources(number, workers)
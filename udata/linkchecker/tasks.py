@@ -1,19 +1,72 @@
 import logging
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
 
 from flask import current_app
 
 from udata.models import Dataset
 from udata.tasks import job
-from udata.utils import get_by
+from udata.utils import batched, get_by
 
 from .checker import check_resource
 
 log = logging.getLogger(__name__)
 
+# Number of resources loaded together from their datasets
+BATCH_SIZE = 100
+
+
+class HostThrottle(object):
+    """
+    Limit the number of concurrent checks on a given host
+    and space their start by at least `delay` seconds.
+    """
+
+    def __init__(self, concurrency, delay):
+        self.concurrency = concurrency
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.semaphores = {}
+        self.next_starts = {}
+
+    @contextmanager
+    def limit(self, url):
+        host = urlparse(url or "").netloc
+        with self.lock:
+            semaphore = self.semaphores.setdefault(
+                host, threading.BoundedSemaphore(self.concurrency)
+            )
+        with semaphore:
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, self.next_starts.get(host, now))
+                self.next_starts[host] = start + self.delay
+            time.sleep(start - now)
+            yield
+
+
+def fetch_resources(rows):
+    """Fetch the resources of aggregated `rows` with a single query on their datasets"""
+    datasets = {
+        dataset.id: dataset
+        for dataset in Dataset.objects(id__in={row["_id"] for row in rows}).no_cache()
+    }
+    for row in rows:
+        resource_id = row["resources"]["_id"]
+        dataset = datasets.get(row["_id"])
+        resource = get_by(dataset.resources, "id", uuid.UUID(resource_id)) if dataset else None
+        if resource is None:
+            log.warning("Resource %s not found", resource_id)
+            continue
+        yield resource
+
 
 @job("check_resources")
-def check_resources(self, number):
+def check_resources(self, number, workers=None):
     """Check <number> of URLs that have not been (recently) checked"""
     if not current_app.config.get("LINKCHECKING_ENABLED"):
         log.error("Link checking is disabled.")
@@ -41,15 +94,33 @@ def check_resources(self, number):
         resources += list(Dataset.objects.aggregate(*pipeline))
 
     nb_resources = len(resources)
-    log.info("Checking %s resources...", nb_resources)
-    for idx, dataset_resource in enumerate(resources):
-        dataset_obj = Dataset.objects.get(id=dataset_resource["_id"])
-        resource_id = dataset_resource["resources"]["_id"]
-        rid = uuid.UUID(resource_id)
-        resource_obj = get_by(dataset_obj.resources, "id", rid)
-        log.info("Checking resource %s (%s/%s)", resource_id, idx + 1, nb_resources)
-        if resource_obj.need_check():
-            check_resource(resource_obj)
-        else:
-            log.info("--> Skipping this resource, cache is fresh enough.")
+    workers = workers or current_app.config["LINKCHECKING_WORKERS"]
+    throttle = HostThrottle(
+        current_app.config["LINKCHECKING_HOST_CONCURRENCY"],
+        current_app.config["LINKCHECKING_HOST_DELAY"],
+    )
+    app = current_app._get_current_object()
+
+    def check(idx, resource):
+        with app.app_context():
+            log.info("Checking resource %s (%s/%s)", resource.id, idx + 1, nb_resources)
+            if not resource.need_check():
+                log.info("--> Skipping this resource, cache is fresh enough.")
+                return
+            try:
+                with throttle.limit(resource.url):
+                    check_resource(resource)
+            except Exception:
+                log.exception("Unable to check resource %s", resource.id)
+
+    log.info("Checking %s resources with %s workers...", nb_resources, workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        idx = 0
+        for rows in batched(resources, BATCH_SIZE):
+            futures = []
+            for resource in fetch_resources(rows):
+                futures.append(executor.submit(check, idx, resource))
+                idx += 1
+            for future in futures:
+                future.result()
     log.info("Done.")
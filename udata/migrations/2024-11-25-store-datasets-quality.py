@@ -0,0 +1,15 @@
+"""
+This migration stores the quality of every dataset so it can be queried and sorted on
+"""
+
+import logging
+
+from udata.core.dataset.tasks import update_datasets_quality
+
+log = logging.getLogger(__name__)
+
+
+def migrate(db):
+    log.info("Computing datasets quality...")
+    update_datasets_quality()
+    log.info("Done")
@@ -2,11 +2,16 @@ import logging
 from collections.abc import Iterable
 
 from flask_mongoengine import Document
+from mongoengine.errors import NotUniqueError
 
 from .queryset import UDataQuerySet
+from .slug_fields import SlugField
 
 log = logging.getLogger(__name__)
 
+# Number of slug allocations tried before a slug collision error is raised
+SLUG_SAVE_ATTEMPTS = 3
+
 
 def serialize(value):
     if hasattr(value, "to_dict"):
@@ -25,6 +30,33 @@ class UDataDocument(Document):
         "queryset_class": UDataQuerySet,
     }
 
+    def save(self, *args, **kwargs):
+        """
+        Save the document, allocating its unique slugs again
+        when a concurrent save took them in the meantime.
+        """
+        slugs = [
+            field
+            for field in self._fields.values()
+            if isinstance(field, SlugField) and field.unique
+        ]
+        if not slugs:
+            return super().save(*args, **kwargs)
+        values = {field.name: self._data.get(field.name) for field in slugs}
+        changed_fields = list(self._changed_fields)
+        for attempt in range(1, SLUG_SAVE_ATTEMPTS + 1):
+            try:
+                return super().save(*args, **kwargs)
+            except NotUniqueError as error:
+                if attempt == SLUG_SAVE_ATTEMPTS or not any(
+                    field.db_field in str(error) for field in slugs
+                ):
+                    raise
+                log.warning("Slug collision saving %s, allocating it again", self)
+                # Restore slugs as before this attempt to have them populated again
+                self._data.update(values)
+                self._changed_fields = list(changed_fields)
+
     def to_dict(self, exclude=None):
         id_field = self._meta["id_field"]
         excluded_keys = set(exclude or [])
@@ -2,12 +2,40 @@ import logging
 
 from bson import DBRef, ObjectId
 from flask_mongoengine import BaseQuerySet
+from mongoengine.base import LazyReference
+from mongoengine.dereference import DeReference
+from mongoengine.fields import ReferenceField
 
 from udata.utils import Paginable
 
 log = logging.getLogger(__name__)
 
 
+def dereference(documents):
+    """
+    Fetch the references of `documents` with a single `$in` query per referenced model.
+
+    Documents with a dangling reference are filtered out:
+    this can happen when someone manually delete an object in DB (ie. without proper purge).
+    The error is logged (ie. visible in sentry, silent for user)
+    so a result is always returned, even not complete.
+    """
+    safe_documents = []
+    for document in DeReference()(list(documents), max_depth=1):
+        dangling = [
+            name
+            for name, field in document._fields.items()
+            if isinstance(field, ReferenceField)
+            and isinstance(document._data.get(name), DBRef)
+            and not isinstance(document._data.get(name), LazyReference)
+        ]
+        if dangling:
+            log.error("Dangling references %s in %r", ", ".join(dangling), document)
+        else:
+            safe_documents.append(document)
+    return safe_documents
+
+
 class DBPaginator(Paginable):
     """A simple paginable implementation"""
 
@@ -36,6 +64,11 @@ class DBPaginator(Paginable):
     def objects(self):
         return self.queryset.items
 
+    def dereference(self):
+        """Fetch the page objects references in bulk and filter out dangling ones"""
+        self.queryset.items = dereference(self.queryset.items)
+        return self
+
 
 class UDataQuerySet(BaseQuerySet):
     def paginate(self, page, per_page, **kwargs):
@@ -1,10 +1,12 @@
 import logging
+import re
 
 import slugify
 from flask_mongoengine import Document
 from mongoengine.fields import StringField
 from mongoengine.signals import post_delete, pre_save
 
+from udata.app import cache
 from udata.utils import is_uuid
 
 from .queryset import UDataQuerySet
@@ -70,6 +72,10 @@ class SlugField(StringField):
             value, max_length=self.max_length, separator=self.separator, to_lower=self.lower_case
         )
 
+    def cache_key(self, slug):
+        """The key caching the identifier of the object a slug resolves to"""
+        return "slug-resolution:{0}:{1}".format(self.owner_document.__name__, slug)
+
     def latest(self, value):
         """
         Get the latest object for a given old slug
@@ -164,21 +170,38 @@ def populate_slug(instance, field):
     # Ensure uniqueness
     if field.unique:
         base_slug = slug
-        index = 1
         qs = instance.__class__.objects
         if previous:
             qs = qs(id__ne=previous.id)
 
-        def exists(s):
-            return qs(**{field.db_field: s}).clear_cls_query().limit(1).count(True) > 0
-
-        while exists(slug):
-            # keep space for index suffix, trim slug if needed
-            slug_overflow = len("{0}-{1}".format(base_slug, index)) - field.max_length
-            if slug_overflow >= 1:
-                base_slug = base_slug[:-slug_overflow]
+        def allocation(base):
+            """
+            Whether `base` is taken and the index following the highest suffix
+            taken among its variants (`base` itself counting as 0).
+
+            Only those are returned by the database, from a single indexed query.
+            """
+            pattern = r"^{0}(-\d{{1,9}})?$".format(re.escape(base))
+            query = qs(**{"{0}__regex".format(field.db_field): pattern}).clear_cls_query()
+            value = "${0}".format(field.db_field)
+            suffix = {"$substrCP": [value, len(base) + 1, {"$strLenCP": value}]}
+            group = {
+                "_id": None,
+                "taken": {"$max": {"$eq": [value, {"$literal": base}]}},
+                "index": {"$max": {"$toInt": {"$concat": ["0", suffix]}}},
+            }
+            row = next(query.aggregate([{"$group": group}]), None)
+            return (False, 1) if row is None else (row["taken"], row["index"] + 1)
+
+        taken, index = allocation(base_slug)
+        while taken:
             slug = "{0}-{1}".format(base_slug, index)
-            index += 1
+            # keep space for index suffix, trim slug if needed
+            slug_overflow = len(slug) - (field.max_length or len(slug))
+            if slug_overflow < 1:
+                break
+            base_slug = base_slug[:-slug_overflow]
+            index = max(index, allocation(base_slug)[1])
 
         if is_uuid(slug):
             slug = "{0}-uuid".format(slug)
@@ -202,5 +225,8 @@ def populate_slug(instance, field):
             # Maintain previous redirects
             SlugFollow.objects(namespace=ns, new_slug=old_slug).update(new_slug=slug)
 
+    # This slug may have been resolved to another object (previous owner or redirection)
+    cache.delete(field.cache_key(slug))
+
     setattr(instance, field.db_field, slug)
     return slug
@@ -2,11 +2,12 @@
 This module centralize udata-wide RDF helpers and configuration
 """
 
+import json
 import logging
 import re
 from html.parser import HTMLParser
 
-from flask import abort, current_app, request, url_for
+from flask import Response, abort, current_app, request, stream_with_context, url_for
 from rdflib import BNode, Graph, Literal, URIRef
 from rdflib.namespace import (
     DCTERMS,
@@ -112,6 +113,9 @@ RDF_EXTENSIONS = {
     # 'trix': 'trix',
 }
 
+# Formats which can be written as a sequence of independently serialized graphs
+STREAMING_FORMATS = ("nt", "turtle", "json-ld")
+
 # Includes control characters, unicode surrogate characters and unicode end-of-plane non-characters
 ILLEGAL_XML_CHARS = "[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]"
 
@@ -485,3 +489,45 @@ def graph_response(graph, format):
     if isinstance(graph, RdfResource):
         graph = graph.graph
     return escape_xml_illegal_chars(graph.serialize(format=fmt, **kwargs)), 200, headers
+
+
+def stream_graphs(graphs, format):
+    """
+    Serialize a sequence of RDF graphs as a single document, graph by graph.
+
+    Only one graph is held in memory at once. Nodes shared by many graphs
+    (ie. a catalog) are written once per graph and merged back by consumers.
+    Turtle chunks each declare their own prefixes, which Turtle allows.
+    """
+    fmt = guess_format(format)
+    if fmt not in STREAMING_FORMATS:
+        raise ValueError(f"Unsupported streaming format: {format}")
+    if fmt == "json-ld":
+        yield '{"@context": %s, "@graph": [' % json.dumps(CONTEXT)
+    separator = ""
+    for graph in graphs:
+        if isinstance(graph, RdfResource):
+            graph = graph.graph
+        if not len(graph):
+            continue
+        if fmt == "json-ld":
+            document = json.loads(graph.serialize(format=fmt, context=CONTEXT))
+            document.pop("@context", None)
+            for node in document.get("@graph", [document]):
+                yield separator + escape_xml_illegal_chars(json.dumps(node))
+                separator = ","
+        else:
+            yield escape_xml_illegal_chars(graph.serialize(format=fmt))
+    if fmt == "json-ld":
+        yield "]}"
+
+
+def stream_response(graphs, format):
+    """
+    Return a flask streaming response for a sequence of RDF graphs given an expected format.
+    """
+    fmt = guess_format(format)
+    if fmt not in STREAMING_FORMATS:
+        abort(404)
+    stream = stream_with_context(stream_graphs(graphs, format))
+    return Response(stream, mimetype=RDF_MIME_TYPES[fmt])
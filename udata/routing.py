@@ -1,13 +1,14 @@
 from uuid import UUID
 
 from bson import ObjectId
-from flask import redirect, request, url_for
+from flask import current_app, redirect, request, url_for
 from mongoengine.errors import InvalidQueryError, ValidationError
 from werkzeug.exceptions import NotFound
 from werkzeug.routing import BaseConverter, PathConverter
 from werkzeug.urls import url_quote
 
 from udata import models
+from udata.app import cache
 from udata.core.dataservices.models import Dataservice
 from udata.core.spatial.models import GeoZone
 from udata.i18n import ISO_639_1_CODES
@@ -63,6 +64,7 @@ class ModelConverter(BaseConverter):
     When serializing to python, ir try in the following order:
 
     * fetch by id
+    * fetch by id from the cached slug resolution
     * fetch by slug
     * raise 404
     """
@@ -83,13 +85,41 @@ class ModelConverter(BaseConverter):
         else:
             return url_quote(value)
 
+    def from_cache(self, slug):
+        """
+        Fetch by id the object a slug has been resolved to.
+
+        Stale resolutions (the object has been deleted or renamed without redirection)
+        are dropped and resolved again.
+        """
+        key = self.model.slug.cache_key(slug)
+        id = cache.get(key)
+        if id is None:
+            return
+        obj = self.model.objects(id=id).first()
+        if obj is not None and obj.slug == slug:
+            return obj
+        elif obj is not None and self.has_redirected_slug:
+            return LazyRedirect(obj)
+        cache.delete(key)
+
+    def cache_resolution(self, slug, obj):
+        timeout = current_app.config["SLUG_RESOLUTION_CACHE_DURATION"]
+        cache.set(self.model.slug.cache_key(slug), obj.id, timeout=timeout)
+
     def to_python(self, value):
         try:
             return self.model.objects.get_or_404(id=value)
         except (NotFound, ValidationError):
             pass
+        quoted = self.quote(value)
+        # Only normalized slugs are cached as slugs are stored normalized
+        cacheable = self.has_slug and value == quoted
+        if cacheable:
+            obj = self.from_cache(value)
+            if obj is not None:
+                return obj
         try:
-            quoted = self.quote(value)
             query = db.Q(slug=value) | db.Q(slug=quoted)
             obj = self.model.objects(query).get()
         except (InvalidQueryError, self.model.DoesNotExist):
@@ -97,11 +127,15 @@ class ModelConverter(BaseConverter):
             if self.has_redirected_slug:
                 latest = self.model.slug.latest(value)
                 if latest:
+                    if cacheable:
+                        self.cache_resolution(value, latest)
                     return LazyRedirect(latest)
             return NotFound()
         else:
             if obj.slug != value:
                 return LazyRedirect(quoted)
+        if cacheable:
+            self.cache_resolution(value, obj)
         return obj
 
     def to_url(self, obj):
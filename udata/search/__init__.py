@@ -8,27 +8,26 @@ from mongoengine.signals import post_delete, post_save
 
 import udata.event  # noqa
 from udata.mongo import db
-from udata.tasks import as_task_param, task
+from udata.tasks import DebouncedQueue, as_task_param, task
 
 log = logging.getLogger(__name__)
 
 adapter_catalog = {}
 
 
-@task(route="high.search")
-def reindex(classname, id):
-    if not current_app.config["SEARCH_SERVICE_API_URL"]:
-        return
-    model = db.resolve_model(classname)
-    obj = model.objects.get(pk=id)
-    adapter_class = adapter_catalog.get(model)
-    document = adapter_class.serialize(obj)
+def index_object(http, adapter_class, obj, document):
+    """
+    (Re/Un)Index a single serialized object.
+
+    `http` is either the `requests` module or a `requests.Session`.
+    """
+    model = adapter_class.model
     if adapter_class.is_indexable(obj):
         log.info("Indexing %s (%s)", model.__name__, obj.id)
         url = f"{current_app.config['SEARCH_SERVICE_API_URL']}{adapter_class.search_url}index"
         try:
             payload = {"document": document}
-            r = requests.post(url, json=payload)
+            r = http.post(url, json=payload)
             r.raise_for_status()
         except Exception:
             log.exception('Unable to index/unindex %s "%s"', model.__name__, str(obj.id))
@@ -36,7 +35,7 @@ def reindex(classname, id):
         log.info("Unindexing %s (%s)", model.__name__, obj.id)
         url = f"{current_app.config['SEARCH_SERVICE_API_URL']}{adapter_class.search_url}{str(obj.id)}/unindex"
         try:
-            r = requests.delete(url)
+            r = http.delete(url)
             if r.status_code == 404:
                 # Unindexed already, we don't want to raise
                 return
@@ -45,6 +44,48 @@ def reindex(classname, id):
             log.exception('Unable to index/unindex %s "%s"', model.__name__, str(obj.id))
 
 
+@task(route="high.search")
+def reindex(classname, id):
+    if not current_app.config["SEARCH_SERVICE_API_URL"]:
+        return
+    model = db.resolve_model(classname)
+    obj = model.objects.get(pk=id)
+    adapter_class = adapter_catalog.get(model)
+    document = adapter_class.serialize(obj)
+    index_object(requests, adapter_class, obj, document)
+
+
+@task(route="high.search")
+def reindex_many(classname, ids):
+    """(Re/Un)Index a batch of documents of a given model"""
+    if not current_app.config["SEARCH_SERVICE_API_URL"]:
+        return
+    model = db.resolve_model(classname)
+    adapter_class = adapter_catalog.get(model)
+    # Documents deleted in the meantime are unindexed by the post_delete handler
+    objs = list(model.objects(pk__in=ids))
+    try:
+        documents = adapter_class.serialize_many(objs)
+    except Exception:
+        log.exception("Unable to serialize %s batch, falling back to one by one", model.__name__)
+        for obj in objs:
+            reindex.delay(*as_task_param(obj))
+        return
+    with requests.Session() as session:
+        for obj, document in zip(objs, documents):
+            index_object(session, adapter_class, obj, document)
+
+
+def dispatch_reindexation(classname, ids):
+    reindex_many.delay(classname, ids)
+
+
+# Documents saved several times within the debounce window are only reindexed once
+reindex_queue = DebouncedQueue(
+    dispatch_reindexation, "SEARCH_REINDEX_DEBOUNCE", "SEARCH_SERVICE_INDEX_BATCH_SIZE"
+)
+
+
 @task(route="high.search")
 def unindex(classname, id):
     if not current_app.config["SEARCH_SERVICE_API_URL"]:
@@ -66,7 +107,10 @@ def unindex(classname, id):
 def reindex_model_on_save(sender, document, **kwargs):
     """(Re/Un)Index Mongo document on post_save"""
     if current_app.config.get("AUTO_INDEX") and current_app.config["SEARCH_SERVICE_API_URL"]:
-        reindex.delay(*as_task_param(document))
+        if current_app.config["SEARCH_REINDEX_DEBOUNCE"]:
+            reindex_queue.add(*as_task_param(document))
+        else:
+            reindex.delay(*as_task_param(document))
 
 
 def unindex_model_on_delete(sender, document, **kwargs):
@@ -109,7 +153,12 @@ def query(model, **params):
     return search.execute_search()
 
 
+def flush_reindex_queue(exception=None):
+    reindex_queue.flush()
+
+
 def init_app(app):
+    app.teardown_appcontext(flush_reindex_queue)
     # Register core adapters
     import udata.core.dataset.search  # noqa
     import udata.core.reuse.search  # noqa
@@ -7,6 +7,12 @@ from udata.search.query import SearchQuery
 log = logging.getLogger(__name__)
 
 
+def reference_id(document, name):
+    """The id of a document reference field value, without dereferencing it"""
+    value = document._data.get(name)
+    return getattr(value, "id", value)
+
+
 class ModelSearchAdapter:
     """This class allow to describe and customize the search behavior."""
 
@@ -22,6 +28,39 @@ class ModelSearchAdapter:
         """
         return document.to_dict(exclude=("_id", "_cls", "owner"))
 
+    @classmethod
+    def serialize_many(cls, documents):
+        """
+        Serialize a chunk of documents, preserving order.
+
+        Adapters depending on related documents should override it
+        to fetch them in bulk for the whole chunk.
+        """
+        return [cls.serialize(document) for document in documents]
+
+    @staticmethod
+    def fetch_owners(documents):
+        """
+        Fetch organizations and users owning a chunk of documents with one `$in` query each.
+
+        Return two dicts indexed by id: `(organizations, owners)`.
+        """
+        from udata.models import Organization, User
+
+        org_ids = {reference_id(doc, "organization") for doc in documents} - {None}
+        owner_ids = {
+            reference_id(doc, "owner") for doc in documents if not reference_id(doc, "organization")
+        } - {None}
+        organizations = (
+            {org.id: org for org in Organization.objects(id__in=org_ids)} if org_ids else {}
+        )
+        owners = (
+            {user.id: user for user in User.objects(id__in=owner_ids).only("id")}
+            if owner_ids
+            else {}
+        )
+        return organizations, owners
+
     @classmethod
     def is_indexable(cls, document):
         return True
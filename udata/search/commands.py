@@ -1,13 +1,20 @@
 import logging
+import multiprocessing
 import sys
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import partial
 
 import click
 import requests
 from flask import current_app
+from requests.adapters import HTTPAdapter
 
-from udata.commands import cli
+from udata.commands import DEFAULT_INFO_SETTINGS, cli
 from udata.search import adapter_catalog
+from udata.utils import batched
 
 log = logging.getLogger(__name__)
 
@@ -32,58 +39,282 @@ def iter_adapters():
     return sorted(adapters, key=lambda a: a.model.__name__)
 
 
-def iter_qs(qs, adapter):
-    """Safely iterate over a DB QuerySet yielding a tuple (indexability, serialized documents)"""
-    for obj in qs.no_cache().timeout(False):
-        indexable = adapter.is_indexable(obj)
+def safe_serialize(adapter, obj):
+    """Serialize a single document, logging and returning ``None`` on failure"""
+    try:
+        return adapter.serialize(obj)
+    except Exception as e:
+        model = adapter.model.__name__
+        log.error('Unable to index %s "%s": %s', model, str(obj.id), str(e), exc_info=True)
+
+
+def iter_qs(qs, adapter, chunk_size=100):
+    """
+    Safely iterate over a DB QuerySet yielding a tuple (indexability, serialized documents)
+
+    Documents are serialized by chunks with `adapter.serialize_many` so related objects
+    are fetched in bulk. A failing chunk falls back to one by one serialization.
+    """
+    for chunk in batched(qs.no_cache().timeout(False), chunk_size):
         try:
-            doc = adapter.serialize(obj)
-            yield indexable, doc
-        except Exception as e:
-            model = adapter.model.__name__
-            log.error('Unable to index %s "%s": %s', model, str(obj.id), str(e), exc_info=True)
+            docs = adapter.serialize_many(chunk)
+        except Exception:
+            docs = [safe_serialize(adapter, obj) for obj in chunk]
+        for obj, doc in zip(chunk, docs):
+            if doc is not None:
+                yield adapter.is_indexable(obj), doc
+
+
+IndexReport = namedtuple(
+    "IndexReport", ["indexed", "skipped", "failed", "elapsed", "failed_shards"], defaults=(0,)
+)
+
 
+def merge_reports(reports, elapsed):
+    """Sum shard reports into a single model report spanning `elapsed` seconds"""
+    reports = list(reports)
+    return IndexReport(
+        indexed=sum(r.indexed for r in reports),
+        skipped=sum(r.skipped for r in reports),
+        failed=sum(r.failed for r in reports),
+        elapsed=elapsed,
+        failed_shards=sum(r.failed_shards for r in reports),
+    )
+
+
+def search_session(pool_size):
+    """A requests session keeping up to `pool_size` connections alive to the search service"""
+    session = requests.Session()
+    http_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", http_adapter)
+    session.mount("https://", http_adapter)
+    return session
+
+
+def index_document(session, search_service_url, model_name, index_name, reindex, indexable, doc):
+    """
+    Index or unindex a single serialized document.
+
+    Return ``True`` if the document has been sent, ``False`` if it has been skipped.
+    Errors are logged and reported as ``None``.
+    """
+    try:
+        if indexable:
+            payload = {"document": doc, "index": index_name}
+            url = f"{search_service_url}/{model_name}s/index"
+            r = session.post(url, json=payload)
+            r.raise_for_status()
+        elif not indexable and not reindex:
+            url = f"{search_service_url}/{model_name}s/{doc['id']}/unindex"
+            r = session.delete(url)
+            if r.status_code != 404:  # We don't want to raise on 404
+                r.raise_for_status()
+        else:
+            return False
+    except Exception as e:
+        log.error('Unable to index %s "%s": %s', model_name, str(doc["id"]), str(e), exc_info=True)
+        return None
+    return True
 
-def index_model(adapter, start, reindex=False, from_datetime=None):
-    """Index or unindex all objects given a model"""
+
+def model_queryset(adapter, from_datetime=None, lower=None, upper=None):
+    """
+    The queryset of objects to index for a given adapter.
+
+    `lower` (inclusive) and `upper` (exclusive) optionally restrict it to an `_id` range.
+    """
     model = adapter.model
-    search_service_url = current_app.config["SEARCH_SERVICE_API_URL"]
-    log.info("Indexing %s objects", model.__name__)
     qs = model.objects
     if from_datetime:
         date_property = (
             "last_modified_internal" if model.__name__.lower() in ["dataset"] else "last_modified"
         )
         qs = qs.filter(**{f"{date_property}__gte": from_datetime})
+    if lower:
+        qs = qs.filter(id__gte=lower)
+    if upper:
+        qs = qs.filter(id__lt=upper)
+    return qs
+
+
+def shard_bounds(qs, shards):
+    """
+    Split a queryset into at most `shards` contiguous `_id` ranges of similar sizes.
+
+    Return a list of `(lower, upper)` tuples, `None` meaning unbounded.
+    Ranges are computed by the database in a single `$bucketAuto` pass over `_id`.
+    """
+    pipeline = [{"$bucketAuto": {"groupBy": "$_id", "buckets": shards}}]
+    buckets = qs.order_by().aggregate(pipeline, allowDiskUse=True)
+    bounds = [bucket["_id"]["min"] for bucket in buckets][1:]
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def create_index(adapter, start):
+    """Create a new time-suffixed index for a given adapter and return its name"""
+    index_name = adapter.model.__name__.lower() + "-" + default_index_suffix_name(start)
+    payload = {"index": index_name}
+    url = f"{current_app.config['SEARCH_SERVICE_API_URL']}/create-index"
+    r = requests.post(url, json=payload)
+    r.raise_for_status()
+    return index_name
+
+
+def index_queryset(adapter, qs, index_name, reindex, batch_size, concurrency, label=None):
+    """
+    Index or unindex all objects of a queryset.
+
+    Documents are serialized by batches of `batch_size` while the previous batch
+    is being sent to the search service by up to `concurrency` workers
+    sharing a single connection pool.
+    """
+    search_service_url = current_app.config["SEARCH_SERVICE_API_URL"]
     model_name = adapter.model.__name__.lower()
-    index_name = model_name
-    if reindex:
-        index_name += "-" + default_index_suffix_name(start)
-        payload = {"index": index_name}
-        url = f"{search_service_url}/create-index"
-        r = requests.post(url, json=payload)
-        r.raise_for_status()
+    label = label or adapter.model.__name__
+    statuses = Counter()
+    started = time.perf_counter()
+
+    def wait_for(number, batch_started, futures):
+        results = [future.result() for future in futures]
+        statuses.update(results)
+        elapsed = time.perf_counter() - batch_started
+        log.info(
+            "%s batch %d: %d documents in %.2fs (%.1f docs/s), %d failures",
+            label,
+            number,
+            len(results),
+            elapsed,
+            len(results) / elapsed if elapsed else 0,
+            results.count(None),
+        )
+
+    with search_session(concurrency) as session, ThreadPoolExecutor(concurrency) as executor:
+        send = partial(index_document, session, search_service_url, model_name, index_name, reindex)
+        pending = None
+        # Pulling the next batch serializes it while the previous one is still in flight
+        for number, batch in enumerate(batched(iter_qs(qs, adapter, batch_size), batch_size), 1):
+            futures = [executor.submit(send, indexable, doc) for indexable, doc in batch]
+            if pending:
+                wait_for(*pending)
+            pending = (number, time.perf_counter(), futures)
+        if pending:
+            wait_for(*pending)
+
+    return IndexReport(
+        indexed=statuses[True],
+        skipped=statuses[False],
+        failed=statuses[None],
+        elapsed=time.perf_counter() - started,
+    )
+
+
+def init_shard_worker(settings):
+    """Bootstrap an application context in a freshly spawned shard worker process"""
+    from udata.app import create_app, standalone
+    from udata.commands import init_logging
+
+    app = standalone(create_app(settings, init_logging=init_logging))
+    app.app_context().push()
+
+
+def index_shard(adapter, index_name, reindex, from_datetime, lower, upper, batch_size, concurrency):
+    """Index a single `_id` range of a model (executed in a shard worker process)"""
+    qs = model_queryset(adapter, from_datetime, lower, upper)
+    label = f"{adapter.model.__name__} [{lower or '…'}:{upper or '…'}]"
+    return index_queryset(adapter, qs, index_name, reindex, batch_size, concurrency, label)
+
+
+def index_shards(adapter, index_name, reindex, from_datetime, batch_size, concurrency, workers):
+    """
+    Split a model into `_id` ranges indexed in parallel by a pool of `workers` processes.
 
-    docs = iter_qs(qs, adapter)
-    for indexable, doc in docs:
-        with requests.Session() as session:
+    Shards reports are merged as they complete. A shard raising an exception is counted
+    in `failed_shards` so the caller can decide not to finalize a reindexation.
+    """
+    model = adapter.model.__name__
+    shards = shard_bounds(model_queryset(adapter, from_datetime), workers)
+    reports = []
+    started = time.perf_counter()
+    ctx = click.get_current_context(silent=True)
+    settings = getattr(ctx and ctx.obj, "settings", DEFAULT_INFO_SETTINGS)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_shard_worker,
+        initargs=(settings,),
+    ) as executor:
+        futures = {
+            executor.submit(
+                index_shard,
+                adapter,
+                index_name,
+                reindex,
+                from_datetime,
+                lower,
+                upper,
+                batch_size,
+                concurrency,
+            ): (lower, upper)
+            for lower, upper in shards
+        }
+        for future in as_completed(futures):
+            lower, upper = futures[future]
             try:
-                if indexable:
-                    payload = {"document": doc, "index": index_name}
-                    url = f"{search_service_url}/{model_name}s/index"
-                    r = session.post(url, json=payload)
-                    r.raise_for_status()
-                elif not indexable and not reindex:
-                    url = f"{search_service_url}/{model_name}s/{doc['id']}/unindex"
-                    r = session.delete(url)
-                    if r.status_code != 404:  # We don't want to raise on 404
-                        r.raise_for_status()
-                else:
-                    continue
-            except Exception as e:
-                log.error(
-                    'Unable to index %s "%s": %s', model, str(doc["id"]), str(e), exc_info=True
-                )
+                reports.append(future.result())
+            except Exception:
+                log.exception("%s shard [%s:%s] failed", model, lower, upper)
+                reports.append(IndexReport(0, 0, 0, 0, failed_shards=1))
+            progress = merge_reports(reports, time.perf_counter() - started)
+            log.info(
+                "%s: %d/%d shards done, %d indexed, %d failures",
+                model,
+                len(reports),
+                len(shards),
+                progress.indexed,
+                progress.failed,
+            )
+    return merge_reports(reports, time.perf_counter() - started)
+
+
+def index_model(
+    adapter,
+    start,
+    reindex=False,
+    from_datetime=None,
+    batch_size=None,
+    concurrency=None,
+    workers=None,
+):
+    """
+    Index or unindex all objects given a model.
+
+    With more than one worker, the model is split into `_id` shards
+    indexed in parallel by a process pool.
+    """
+    model = adapter.model
+    batch_size = batch_size or current_app.config["SEARCH_SERVICE_INDEX_BATCH_SIZE"]
+    concurrency = concurrency or current_app.config["SEARCH_SERVICE_INDEX_CONCURRENCY"]
+    log.info("Indexing %s objects", model.__name__)
+    index_name = create_index(adapter, start) if reindex else model.__name__.lower()
+
+    if workers and workers > 1:
+        report = index_shards(
+            adapter, index_name, reindex, from_datetime, batch_size, concurrency, workers
+        )
+    else:
+        qs = model_queryset(adapter, from_datetime)
+        report = index_queryset(adapter, qs, index_name, reindex, batch_size, concurrency)
+
+    log.info(
+        "%s: %d indexed, %d skipped, %d failures in %.2fs (%.1f docs/s)",
+        model.__name__,
+        report.indexed,
+        report.skipped,
+        report.failed,
+        report.elapsed,
+        report.indexed / report.elapsed if report.elapsed else 0,
+    )
+    return report
 
 
 def finalize_reindex(models, start):
@@ -119,7 +350,12 @@ def finalize_reindex(models, start):
 @click.argument("models", nargs=-1, metavar="[<model> ...]")
 @click.option("-r", "--reindex", default=False, type=bool)
 @click.option("-f", "--from_datetime", type=str)
-def index(models=None, reindex=True, from_datetime=None):
+@click.option("-b", "--batch-size", type=int, help="Number of documents sent per batch")
+@click.option("-c", "--concurrency", type=int, help="Number of indexing requests in flight")
+@click.option("-w", "--workers", type=int, default=1, help="Number of shard worker processes")
+def index(
+    models=None, reindex=True, from_datetime=None, batch_size=None, concurrency=None, workers=1
+):
     """
     Initialize or rebuild the search index
 
@@ -129,6 +365,12 @@ def index(models=None, reindex=True, from_datetime=None):
     If reindex is true, indexation will be made on a new index and unindexable documents ignored.
 
     If from_datetime is specified, only models modified since this datetime will be indexed.
+
+    Documents are sent by batches of batch_size with up to concurrency requests in flight.
+    Default values are taken from the SEARCH_SERVICE_INDEX_* settings.
+
+    With more than one worker, each model is split in shards indexed in parallel processes.
+    A reindexation is only finalized once every shard succeeded.
     """
     if not current_app.config["SEARCH_SERVICE_API_URL"]:
         log.error("Missing URL for search service")
@@ -145,9 +387,16 @@ def index(models=None, reindex=True, from_datetime=None):
             log.error("Unknown model %s", model)
             sys.exit(-1)
 
+    failed_shards = 0
     for adapter in iter_adapters():
         if not models or adapter.model.__name__.lower() in models:
-            index_model(adapter, start, reindex, from_datetime)
+            report = index_model(
+                adapter, start, reindex, from_datetime, batch_size, concurrency, workers
+            )
+            failed_shards += report.failed_shards
 
     if reindex:
+        if failed_shards:
+            log.error("%d shards failed, the reindexation is not finalized", failed_shards)
+            sys.exit(-1)
         finalize_reindex(models, start)
@@ -27,9 +27,24 @@ class Defaults(object):
     MONGODB_HOST = "mongodb://localhost:27017/udata"
     MONGODB_CONNECT = False  # Lazy connexion for Fork-safe usage
 
+    # Serialized site DCAT catalog pages are cached this long (in seconds)
+    SITE_CATALOG_CACHE_DURATION = 24 * HOUR
+    # Slugs resolutions by URL converters are cached this long (in seconds)
+    SLUG_RESOLUTION_CACHE_DURATION = 5 * 60
+
     # Search service configuration
     SEARCH_SERVICE_API_URL = None
     SEARCH_SERVICE_REQUEST_TIMEOUT = 20
+    # Bulk indexing: number of documents per batch and of requests in flight
+    SEARCH_SERVICE_INDEX_BATCH_SIZE = 100
+    SEARCH_SERVICE_INDEX_CONCURRENCY = 4
+    # Delay (in seconds) during which saved documents are coalesced before reindexation
+    SEARCH_REINDEX_DEBOUNCE = 5
+
+    # Delay (in seconds) during which dirty objects metrics are coalesced before being updated
+    METRICS_DEBOUNCE = 5
+    # Maximum number of objects per metrics update task
+    METRICS_BATCH_SIZE = 500
 
     # BROKER_TRANSPORT = 'redis'
     CELERY_BROKER_URL = "redis://localhost:6379"
@@ -264,6 +279,18 @@ class Defaults(object):
 
     HARVEST_VALIDATION_CONTACT_FORM = None
 
+    # Directory where remote catalog pages are cached to be revalidated by the next jobs
+    HARVEST_PAGE_CACHE_DIR = None
+
+    # Number of remote catalog pages fetched and parsed ahead of processing (0 to disable)
+    HARVEST_PREFETCH_PAGES = 2
+
+    # Number of processed items persisted together in their harvest job
+    HARVEST_JOB_SAVE_BATCH_SIZE = 50
+
+    # Number of threads converting and saving the datasets of a harvested page (1 to disable)
+    HARVEST_WORKERS = 1
+
     HARVEST_MAX_CATALOG_SIZE_IN_MONGO = None  # Defaults to the size of a MongoDB document
     HARVEST_GRAPHS_S3_BUCKET = None  # If the catalog is bigger than `HARVEST_MAX_CATALOG_SIZE_IN_MONGO` store the graph inside S3 instead of MongoDB
     HARVEST_GRAPHS_S3_FILENAME_PREFIX = ""  # Useful to store the graphs inside a subfolder of the bucket. For example by setting `HARVEST_GRAPHS_S3_FILENAME_PREFIX = 'graphs/'`
@@ -289,6 +316,11 @@ class Defaults(object):
     LINKCHECKING_MAX_CACHE_DURATION = 1080  # in minutes (1 week)
     LINKCHECKING_UNAVAILABLE_THRESHOLD = 100
     LINKCHECKING_DEFAULT_LINKCHECKER = "no_check"
+    # Number of concurrent checks of `udata linkchecker check`
+    LINKCHECKING_WORKERS = 1
+    # Maximum number of concurrent checks and minimum delay in seconds between checks on a host
+    LINKCHECKING_HOST_CONCURRENCY = 2
+    LINKCHECKING_HOST_DELAY = 0
 
     # Ignore some endpoint from API tracking
     # By default ignore the 3 most called APIs
@@ -483,6 +515,8 @@ class Defaults(object):
         "harvest",
     )
     EXPORT_CSV_DATASET_ID = None
+    # Store the CSV exports gzip-compressed
+    EXPORT_CSV_COMPRESS = False
 
     # Autocomplete parameters
     #########################
@@ -558,6 +592,7 @@ class Testing(object):
     SEND_MAIL = False
     WTF_CSRF_ENABLED = False
     AUTO_INDEX = False
+    METRICS_DEBOUNCE = 0  # Update metrics right away (with eager tasks)
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
     TEST_WITH_PLUGINS = False
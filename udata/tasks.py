@@ -1,11 +1,15 @@
 import logging
+import threading
+import time
 from urllib.parse import urlparse
 
 from celery import Celery, Task
 from celery.utils.log import get_task_logger
 from celerybeatmongo.schedulers import MongoScheduler
+from flask import current_app
 
 from udata import entrypoints
+from udata.utils import batched
 
 log = logging.getLogger(__name__)
 
@@ -83,6 +87,61 @@ def as_task_param(obj):
     return obj.__class__.__name__, (obj.pk if isinstance(obj.pk, str) else str(obj.pk))
 
 
+class DebouncedQueue(object):
+    """
+    A process-local set of keys waiting to be dispatched by batches.
+
+    Adding the same key of a same group several times within the debounce window
+    only dispatches it once, and pending keys are given to `dispatch(group, keys)`
+    by batches of at most `batch_size` keys per group.
+    `debounce` and `batch_size` are the names of the settings holding those values.
+    Owners are expected to flush the queue at the end of each application context
+    (request, task or command).
+    """
+
+    def __init__(self, dispatch, debounce, batch_size):
+        self.dispatch = dispatch
+        self.debounce = debounce
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending = {}
+        # Number of pending keys, only read and written while holding the lock
+        self.count = 0
+        self.since = None
+
+    def __len__(self):
+        with self.lock:
+            return self.count
+
+    def add(self, group, key):
+        with self.lock:
+            keys = self.pending.setdefault(group, set())
+            if key not in keys:
+                keys.add(key)
+                self.count += 1
+            self.since = self.since or time.monotonic()
+            elapsed = time.monotonic() - self.since
+            count = self.count
+        if (
+            elapsed >= current_app.config[self.debounce]
+            or count >= current_app.config[self.batch_size]
+        ):
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.pending:
+                return
+            pending, self.pending, self.count, self.since = self.pending, {}, 0, None
+        batch_size = current_app.config[self.batch_size]
+        for group, keys in pending.items():
+            for chunk in batched(sorted(keys), batch_size):
+                try:
+                    self.dispatch(group, chunk)
+                except Exception:
+                    log.exception("Unable to dispatch %s batch", group)
+
+
 def get_logger(name):
     logger = get_task_logger(name)
     return logger
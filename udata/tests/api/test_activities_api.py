@@ -67,3 +67,16 @@ class ActivityAPITest:
         assert200(response)
         len(response.json["data"]) == 1
         assert response.json["data"][0]["related_to"] == reuse.title
+
+    def test_activity_api_list_skips_dangling_references(self, api) -> None:
+        """It should filter out activities whose target has been deleted without purge."""
+        dataset: Dataset = DatasetFactory()
+        reuse: Reuse = ReuseFactory()
+        FakeDatasetActivity.objects.create(actor=UserFactory(), related_to=dataset)
+        FakeReuseActivity.objects.create(actor=UserFactory(), related_to=reuse)
+        Dataset._get_collection().delete_one({"_id": dataset.id})
+
+        response: TestResponse = api.get(url_for("api.activity"))
+        assert200(response)
+        assert len(response.json["data"]) == 1
+        assert response.json["data"][0]["related_to"] == reuse.title
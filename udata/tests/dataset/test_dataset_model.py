@@ -18,7 +18,11 @@ from udata.core.dataset.factories import (
     ResourceFactory,
     ResourceSchemaMockData,
 )
-from udata.core.dataset.models import HarvestDatasetMetadata, HarvestResourceMetadata
+from udata.core.dataset.models import (
+    LICENSES_INDEX_VERSION_KEY,
+    HarvestDatasetMetadata,
+    HarvestResourceMetadata,
+)
 from udata.core.user.factories import UserFactory
 from udata.models import Dataset, License, ResourceSchema, Schema, db
 from udata.tests.helpers import assert_emit, assert_equal_dates, assert_not_emit
@@ -274,6 +278,15 @@ class DatasetModelTest:
             "update_fulfilled_in_time",
         ]
 
+    def test_quality_stored(self):
+        dataset = DatasetFactory(description="", frequency="weekly")
+        assert Dataset.objects.get(id=dataset.id).quality_cached == dataset.quality
+        assert dataset.quality["score"] == Dataset.normalize_score(2)
+
+        dataset.add_resource(ResourceFactory(format="csv"))
+        assert Dataset.objects.get(id=dataset.id).quality_cached["has_open_format"] is True
+        assert dataset.quality["score"] == Dataset.normalize_score(5)
+
     def test_tags_normalized(self):
         tags = [" one another!", " one another!", 'This IS a "tag"…']
         dataset = DatasetFactory(tags=tags)
@@ -557,6 +570,27 @@ class LicenseModelTest:
         assert isinstance(found, License)
         assert license.id == found.id
 
+    def test_index_reused_until_its_version_changes(self, mocker):
+        license = LicenseFactory()
+        get = mocker.patch.object(cache, "get", return_value=1)
+        assert License.guess(license.id) == license
+
+        other = LicenseFactory()
+        assert License.guess(other.id) is None
+
+        get.return_value = 2
+        assert License.guess(other.id) == other
+
+    def test_index_version_changed_on_save_and_delete(self, mocker):
+        set = mocker.patch.object(cache, "set")
+
+        license = LicenseFactory()
+        set.assert_called_once_with(LICENSES_INDEX_VERSION_KEY, mocker.ANY)
+
+        set.reset_mock()
+        license.delete()
+        set.assert_called_once_with(LICENSES_INDEX_VERSION_KEY, mocker.ANY)
+
 
 class ResourceSchemaTest:
     @pytest.mark.options(SCHEMA_CATALOG_URL="https://example.com/notfound")
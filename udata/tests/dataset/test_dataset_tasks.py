@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 import pytest
 
 from udata.core.dataset import tasks
@@ -50,6 +52,22 @@ def test_purge_datasets_community():
     assert CommunityResource.objects.count() == 0
 
 
+def test_update_datasets_quality():
+    dataset = DatasetFactory(description="", frequency="daily")
+    assert dataset.quality["update_fulfilled_in_time"] is True
+    # Time goes by without any change on the dataset
+    Dataset.objects(id=dataset.id).update(
+        set__last_modified_internal=datetime.utcnow() - timedelta(days=2, hours=1)
+    )
+
+    tasks.update_datasets_quality()
+
+    dataset.reload()
+    assert dataset.quality["update_fulfilled_in_time"] is False
+    assert dataset.quality["score"] == Dataset.normalize_score(1)
+    assert Dataset.objects(quality_cached__score=Dataset.normalize_score(1)).count() == 1
+
+
 @pytest.mark.usefixtures("instance_path")
 def test_export_csv(app):
     dataset = DatasetFactory()
@@ -63,3 +81,16 @@ def test_export_csv(app):
         assert model in extras
     fs_filenames = [r.fs_filename for r in dataset.resources if r.url.endswith(r.fs_filename)]
     assert len(fs_filenames) == len(dataset.resources)
+
+
+@pytest.mark.usefixtures("instance_path")
+@pytest.mark.options(EXPORT_CSV_MODELS=["dataset"], EXPORT_CSV_COMPRESS=True)
+def test_export_csv_compressed(app):
+    dataset = DatasetFactory()
+    app.config["EXPORT_CSV_DATASET_ID"] = dataset.id
+    tasks.export_csv()
+    dataset = Dataset.objects.get(id=dataset.id)
+    assert len(dataset.resources) == 1
+    resource = dataset.resources[0]
+    assert resource.title.endswith(".csv.gz")
+    assert resource.extras["csv-export:model"] == "dataset"
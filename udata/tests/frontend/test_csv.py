@@ -257,6 +257,54 @@ class CsvTest(FrontTestCase):
             self.assertEqual(row[0], obj.title)
             self.assertEqual(row[1], obj.description)
 
+    def test_adapter_projection_by_batches(self):
+        @csv.adapter(Fake)
+        class Adapter(csv.Adapter):
+            fields = ["title", ("description", lambda o: o.description)]
+            extra_projection = []
+            batch_size = 2
+
+        objects = [FakeFactory() for _ in range(3)]
+        adapter = Adapter(Fake.objects.order_by("id"))
+
+        rows = list(adapter.rows())
+        self.assertEqual(rows, [[obj.title, None] for obj in objects])
+
+    def test_adapter_projection_from_fields(self):
+        class Adapter(csv.Adapter):
+            fields = [
+                "title",
+                ("sub_name", "sub.name"),
+                ("description", lambda o: o.description),
+                ("property", "display_title"),
+            ]
+            extra_projection = ["description"]
+
+        adapter = Adapter(Fake.objects)
+
+        assert adapter.get_projection(Fake) == ["description", "sub", "title"]
+
+    def test_adapter_without_projection(self):
+        class Adapter(csv.Adapter):
+            fields = ["title"]
+
+        assert Adapter(Fake.objects).get_projection(Fake) is None
+
+    def test_write(self):
+        @csv.adapter(Fake)
+        class Adapter(csv.Adapter):
+            fields = ["title", "description"]
+
+        objects = FakeFactory.build_batch(2)
+        out = StringIO()
+
+        csv.write(Adapter(objects), out)
+
+        out.seek(0)
+        rows = list(csv.get_reader(out))
+        self.assertEqual(rows[0], ["title", "description"])
+        self.assertEqual(rows[1:], [[obj.title, obj.description] for obj in objects])
+
     def assert_stream_csv(self, endpoint):
         return self.assert_csv(endpoint, [FakeFactory() for _ in range(3)])
 
@@ -35,6 +35,7 @@ class OrganizationModelTest(TestCase, DBTestMixin):
                 following=org, follower=UserFactory(), since=datetime.utcnow()
             )
 
+        org.reload()
         assert org.get_metrics()["datasets"] == 1
         assert org.get_metrics()["reuses"] == 1
         assert org.get_metrics()["followers"] == 1
@@ -49,6 +50,7 @@ class OrganizationModelTest(TestCase, DBTestMixin):
             follow.until = datetime.utcnow()
             follow.save()
 
+        org.reload()
         assert org.get_metrics()["datasets"] == 0
         assert org.get_metrics()["reuses"] == 0
         assert org.get_metrics()["followers"] == 0
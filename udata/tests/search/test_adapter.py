@@ -1,5 +1,6 @@
 import datetime
-from unittest.mock import patch
+import threading
+from unittest.mock import DEFAULT, patch
 
 import pytest
 from flask import current_app
@@ -12,11 +13,23 @@ from udata.core.dataset.factories import (
     HiddenDatasetFactory,
     ResourceFactory,
 )
-from udata.core.dataset.models import Schema
+from udata.core.dataset.models import Dataset, Schema
 from udata.core.dataset.search import DatasetSearch
+from udata.core.organization.factories import OrganizationFactory
+from udata.core.reuse.factories import ReuseFactory
+from udata.core.reuse.search import ReuseSearch
+from udata.core.topic.factories import TopicFactory
+from udata.core.user.factories import UserFactory
 from udata.i18n import gettext as _
-from udata.search import as_task_param, reindex
-from udata.search.commands import index_model
+from udata.search import as_task_param, reindex, reindex_many, reindex_queue
+from udata.search.commands import (
+    IndexReport,
+    index_model,
+    merge_reports,
+    model_queryset,
+    shard_bounds,
+)
+from udata.tasks import DebouncedQueue
 from udata.tests.api import APITestCase
 from udata.utils import clean_string
 
@@ -126,6 +139,56 @@ class IndexingLifecycleTest(APITestCase):
         url = f"{current_app.config['SEARCH_SERVICE_API_URL']}{DatasetSearch.search_url}index"
         mock_req.assert_called_with(url, json=expected_value)
 
+    @patch("requests.Session.delete")
+    @patch("requests.Session.post")
+    def test_reindex_many(self, mock_post, mock_delete):
+        dataset = DatasetFactory()
+        hidden = HiddenDatasetFactory()
+
+        reindex_many.run("Dataset", [str(dataset.id), str(hidden.id)])
+
+        search_service_url = current_app.config["SEARCH_SERVICE_API_URL"]
+        url = f"{search_service_url}{DatasetSearch.search_url}index"
+        expected_value = {"document": DatasetSearch.serialize(dataset)}
+        mock_post.assert_called_once_with(url, json=expected_value)
+        url = f"{search_service_url}{DatasetSearch.search_url}{str(hidden.id)}/unindex"
+        mock_delete.assert_called_once_with(url)
+
+    @pytest.mark.options(AUTO_INDEX=True, SEARCH_REINDEX_DEBOUNCE=60)
+    @patch("udata.search.reindex_many.delay")
+    def test_reindex_queue_coalesce_saves(self, mock_delay):
+        dataset = DatasetFactory()
+        dataset.title = "New title"
+        dataset.save()
+        reuse = ReuseFactory()
+
+        mock_delay.assert_not_called()
+        assert len(reindex_queue) == 2
+
+        reindex_queue.flush()
+
+        assert mock_delay.call_count == 2
+        mock_delay.assert_any_call("Dataset", [str(dataset.id)])
+        mock_delay.assert_any_call("Reuse", [str(reuse.id)])
+        assert len(reindex_queue) == 0
+
+    @pytest.mark.options(
+        AUTO_INDEX=True, SEARCH_REINDEX_DEBOUNCE=60, SEARCH_SERVICE_INDEX_BATCH_SIZE=2
+    )
+    @patch("udata.search.reindex_many.delay")
+    def test_reindex_queue_flush_full_batch(self, mock_delay):
+        datasets = DatasetFactory.create_batch(2)
+
+        mock_delay.assert_called_once_with("Dataset", sorted(str(d.id) for d in datasets))
+        assert len(reindex_queue) == 0
+
+    @pytest.mark.options(AUTO_INDEX=True, SEARCH_REINDEX_DEBOUNCE=0)
+    @patch("udata.search.reindex.delay")
+    def test_reindex_without_debounce(self, mock_delay):
+        dataset = DatasetFactory()
+
+        mock_delay.assert_called_once_with(*as_task_param(dataset))
+
     @patch("requests.Session.post")
     def test_index_model(self, mock_req):
         fake_data = DatasetFactory(id="61fd30cb29ea95c7bc0e1211")
@@ -173,3 +236,125 @@ class IndexingLifecycleTest(APITestCase):
         expected_value = {"document": DatasetSearch.serialize(fake_data), "index": "dataset"}
         url = f"{current_app.config['SEARCH_SERVICE_API_URL']}/datasets/index"
         mock_req.assert_called_with(url, json=expected_value)
+
+    @patch("requests.Session.delete")
+    @patch("requests.Session.post")
+    def test_index_model_by_batches(self, mock_post, mock_delete):
+        DatasetFactory.create_batch(4)
+        HiddenDatasetFactory()
+        mock_post.side_effect = [DEFAULT, DEFAULT, DEFAULT, Exception("Unavailable")]
+
+        report = index_model(DatasetSearch, start=None, reindex=False, batch_size=2, concurrency=2)
+
+        assert mock_post.call_count == 4
+        assert mock_delete.call_count == 1
+        assert report.indexed == 4
+        assert report.skipped == 0
+        assert report.failed == 1
+
+    @patch("requests.post")
+    @patch("requests.Session.delete")
+    @patch("requests.Session.post")
+    def test_reindex_model_skip_unindexable(self, mock_post, mock_delete, mock_req):
+        DatasetFactory()
+        HiddenDatasetFactory()
+
+        report = index_model(DatasetSearch, start=datetime.datetime(2022, 2, 20), reindex=True)
+
+        assert mock_post.call_count == 1
+        mock_delete.assert_not_called()
+        assert report.indexed == 1
+        assert report.skipped == 1
+        assert report.failed == 0
+
+    def test_shard_bounds_cover_all_documents(self):
+        datasets = DatasetFactory.create_batch(5)
+
+        shards = shard_bounds(Dataset.objects, 2)
+
+        assert len(shards) == 2
+        assert shards[0][0] is None
+        assert shards[0][1] == shards[1][0]
+        assert shards[1][1] is None
+        ids = [
+            id
+            for lower, upper in shards
+            for id in model_queryset(DatasetSearch, lower=lower, upper=upper).scalar("id")
+        ]
+        assert sorted(ids) == sorted(d.id for d in datasets)
+
+    def test_shard_bounds_empty_queryset(self):
+        assert shard_bounds(Dataset.objects, 4) == [(None, None)]
+
+
+class SerializeManyTest(APITestCase):
+    def test_datasets_serialize_many(self):
+        org = OrganizationFactory()
+        user = UserFactory()
+        datasets = [
+            DatasetFactory(organization=org, geo=True),
+            DatasetFactory(owner=user),
+            DatasetFactory(organization=org),
+        ]
+        topic = TopicFactory(datasets=datasets[:2])
+        other_topic = TopicFactory(datasets=datasets[1:2])
+        datasets = list(Dataset.objects.order_by("id"))
+
+        documents = DatasetSearch.serialize_many(datasets)
+
+        assert documents == [DatasetSearch.serialize(dataset) for dataset in datasets]
+        assert [doc["id"] for doc in documents] == [str(dataset.id) for dataset in datasets]
+        assert documents[0]["organization"]["id"] == str(org.id)
+        assert documents[0]["owner"] is None
+        assert documents[0]["geozones"][0]["id"] == datasets[0].spatial.zones[0].id
+        assert documents[1]["organization"] is None
+        assert documents[1]["owner"] == str(user.id)
+        assert documents[0]["topics"] == [str(topic.id)]
+        assert sorted(documents[1]["topics"]) == sorted([str(topic.id), str(other_topic.id)])
+        assert documents[2]["topics"] == []
+
+    def test_reuses_serialize_many(self):
+        org = OrganizationFactory()
+        user = UserFactory()
+        ReuseFactory(organization=org)
+        ReuseFactory(owner=user)
+        reuses = list(ReuseSearch.model.objects.order_by("id"))
+
+        documents = ReuseSearch.serialize_many(reuses)
+
+        assert documents == [ReuseSearch.serialize(reuse) for reuse in reuses]
+        assert documents[0]["organization"]["id"] == str(org.id)
+        assert documents[1]["owner"] == str(user.id)
+
+    def test_serialize_many_empty(self):
+        assert DatasetSearch.serialize_many([]) == []
+
+
+class DebouncedQueueTest:
+    @pytest.mark.options(SEARCH_REINDEX_DEBOUNCE=60, SEARCH_SERVICE_INDEX_BATCH_SIZE=10000)
+    def test_concurrent_add(self, app):
+        queue = DebouncedQueue(
+            search.dispatch_reindexation,
+            "SEARCH_REINDEX_DEBOUNCE",
+            "SEARCH_SERVICE_INDEX_BATCH_SIZE",
+        )
+
+        def add(classname):
+            with app.app_context():
+                for i in range(1000):
+                    queue.add(classname, str(i))
+
+        threads = [threading.Thread(target=add, args=(f"Model{n}",)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(queue) == 8000
+
+
+class IndexReportTest:
+    def test_merge_reports(self):
+        reports = [IndexReport(3, 1, 0, 2.0), IndexReport(2, 0, 1, 3.0, failed_shards=1)]
+
+        assert merge_reports(reports, 3.5) == IndexReport(5, 1, 1, 3.5, failed_shards=1)
@@ -66,3 +66,49 @@ class SiteMetricTest:
         site.count_harvesters()
 
         assert site.get_metrics()["harvesters"] == len(sources)
+
+    def test_compute_metrics(self, app):
+        site = SiteFactory.create(id=app.config["SITE_ID"])
+        site.metrics["public-service"] = 1
+        site.save()
+        DatasetFactory.create_batch(2, nb_resources=2)
+        HiddenDatasetFactory(nb_resources=5)
+        VisibleReuseFactory.create_batch(3)
+        OrganizationFactory.create_batch(2)
+        HarvestSourceFactory()
+        DatasetFactory(metrics={"followers": 7, "reuses": 2})
+
+        timings = site.compute_metrics()
+
+        site.reload()
+        metrics = site.get_metrics()
+        # One dataset per visible reuse
+        assert metrics["datasets"] == 6
+        assert metrics["resources"] == 4
+        assert metrics["reuses"] == 3
+        assert metrics["organizations"] == 2
+        assert metrics["harvesters"] == 1
+        assert metrics["max_dataset_followers"] == 7
+        assert metrics["max_dataset_reuses"] == 2
+        assert metrics["max_org_followers"] == 0
+        assert metrics["public-service"] == 1
+        assert set(timings) == {
+            "datasets",
+            "reuses",
+            "organizations",
+            "users",
+            "followers",
+            "discussions",
+            "harvesters",
+        }
+
+    def test_compute_metrics_drop(self, app):
+        site = SiteFactory.create(id=app.config["SITE_ID"])
+        site.metrics["public-service"] = 1
+        site.save()
+
+        site.compute_metrics(drop=True)
+
+        site.reload()
+        assert "public-service" not in site.metrics
+        assert site.metrics["datasets"] == 0
@@ -11,7 +11,8 @@ from udata.core.organization.factories import OrganizationFactory
 from udata.core.site.factories import SiteFactory
 from udata.core.site.rdf import build_catalog
 from udata.core.user.factories import UserFactory
-from udata.rdf import CONTEXT, DCAT, DCT, HYDRA
+from udata.rdf import CONTEXT, DCAT, DCT, HYDRA, guess_format
+from udata.settings import Testing
 from udata.tests.helpers import assert200, assert404, assert_redirects
 
 pytestmark = pytest.mark.usefixtures("clean_db")
@@ -228,6 +229,52 @@ class SiteRdfViewsTest:
         assert not pagination.value(HYDRA.previous)
         assert pagination.value(HYDRA.next).identifier == URIRef(next_url)
 
+    def test_catalog_rdf_etag(self, client):
+        DatasetFactory.create_batch(2)
+        url = url_for("api.site_rdf_catalog_format", format="n3")
+
+        response = client.get(url, headers={"Accept": "text/n3"})
+        assert200(response)
+        etag, _ = response.get_etag()
+        assert etag
+        assert response.last_modified is not None
+
+        response = client.get(url, headers={"Accept": "text/n3", "If-None-Match": f'"{etag}"'})
+        assert response.status_code == 304
+        assert not response.data
+
+    def test_catalog_rdf_etag_changes_with_content(self, client):
+        DatasetFactory.create_batch(2)
+        url = url_for("api.site_rdf_catalog_format", format="n3")
+        etag, _ = client.get(url, headers={"Accept": "text/n3"}).get_etag()
+
+        DatasetFactory()
+
+        response = client.get(url, headers={"Accept": "text/n3", "If-None-Match": f'"{etag}"'})
+        assert200(response)
+        assert response.get_etag()[0] != etag
+
+    @pytest.mark.parametrize("fmt", ("nt", "ttl", "json"))
+    def test_catalog_dump(self, fmt, client):
+        DatasetFactory.create_batch(3)
+        DataserviceFactory()
+        url = url_for("api.site_rdf_catalog_dump", format=fmt)
+
+        response = client.get(url)
+        assert200(response)
+        assert response.is_streamed
+
+        graph = Graph().parse(data=response.data, format=guess_format(fmt))
+        catalog = graph.resource(next(graph.subjects(RDF.type, DCAT.Catalog)))
+        assert len(list(catalog.objects(DCAT.dataset))) == 3
+        assert len(list(catalog.objects(DCAT.service))) == 1
+        assert graph.value(catalog.identifier, HYDRA.view) is None
+
+    def test_catalog_dump_format_not_streamable(self, client):
+        url = url_for("api.site_rdf_catalog_dump", format="xml")
+        response = client.get(url)
+        assert404(response)
+
     def test_catalog_format_unknown(self, client):
         url = url_for("api.site_rdf_catalog_format", format="unknown")
         response = client.get(url)
@@ -313,3 +360,27 @@ class SiteRdfViewsTest:
         dataservices = list(graph.subjects(RDF.type, DCAT.DataService))
         assert len(dataservices) == 1
         assert str(graph.value(dataservices[0], DCT.identifier)) == str(dataservice_b.id)
+
+
+class CatalogCacheSettings(Testing):
+    CACHE_TYPE = "flask_caching.backends.simple"
+
+
+class SiteRdfCachedViewsTest:
+    settings = CatalogCacheSettings
+
+    def test_catalog_rdf_etag_changes_with_organization(self, client):
+        organization = OrganizationFactory()
+        DatasetFactory.create_batch(2, organization=organization)
+        url = url_for("api.site_rdf_catalog_format", format="n3")
+        etag, _ = client.get(url, headers={"Accept": "text/n3"}).get_etag()
+
+        response = client.get(url, headers={"Accept": "text/n3", "If-None-Match": f'"{etag}"'})
+        assert response.status_code == 304
+
+        organization.name = "Renamed organization"
+        organization.save()
+
+        response = client.get(url, headers={"Accept": "text/n3", "If-None-Match": f'"{etag}"'})
+        assert200(response)
+        assert response.get_etag()[0] != etag
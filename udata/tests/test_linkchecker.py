@@ -1,4 +1,8 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 
 import mock
 import pytest
@@ -9,6 +13,7 @@ from udata.core.activity.models import Activity
 from udata.core.dataset.factories import DatasetFactory, ResourceFactory
 from udata.core.user.factories import UserFactory
 from udata.linkchecker.checker import check_resource
+from udata.linkchecker.tasks import HostThrottle, check_resources
 from udata.settings import Testing
 from udata.tests import TestCase
 
@@ -275,3 +280,79 @@ class LinkcheckerTest(TestCase):
             "check:count-availability": 300,
         }
         self.assertTrue(self.resource.need_check())
+
+    @mock.patch("udata.linkchecker.checker.get_linkchecker")
+    def test_check_resource_updates_only_its_extras(self, mock_fn):
+        other = ResourceFactory(extras={"key": "value"})
+        self.dataset.resources.append(other)
+        self.dataset.save()
+        check_res = {"check:status": 200, "check:available": True, "check:date": datetime.utcnow()}
+
+        class DummyLinkchecker:
+            def check(self, _):
+                return check_res
+
+        mock_fn.return_value = DummyLinkchecker
+
+        check_resource(self.resource)
+
+        self.dataset.reload()
+        self.assertEqual(self.dataset.resources[0].extras["check:status"], 200)
+        self.assertEqual(self.dataset.resources[0].extras["check:count-availability"], 1)
+        self.assertEqual(self.dataset.resources[1].extras, {"key": "value"})
+
+    @mock.patch("udata.linkchecker.checker.get_linkchecker")
+    def test_check_resources_concurrently(self, mock_fn):
+        datasets = DatasetFactory.create_batch(3, resources=ResourceFactory.build_batch(2))
+
+        class DummyLinkchecker:
+            def check(self, _):
+                return {
+                    "check:status": 200,
+                    "check:available": True,
+                    "check:date": datetime.utcnow(),
+                }
+
+        mock_fn.return_value = DummyLinkchecker
+
+        check_resources(10, workers=4)
+
+        for dataset in [self.dataset, *datasets]:
+            dataset.reload()
+            for resource in dataset.resources:
+                self.assertEqual(resource.extras["check:status"], 200)
+
+
+class HostThrottleTest:
+    def test_limit_concurrency_per_host(self):
+        throttle = HostThrottle(concurrency=2, delay=0)
+        running = []
+        peak = {}
+        lock = threading.Lock()
+
+        def check(url):
+            host = urlparse(url).netloc
+            with throttle.limit(url):
+                with lock:
+                    running.append(host)
+                    peak[host] = max(peak.get(host, 0), running.count(host))
+                time.sleep(0.01)
+                with lock:
+                    running.remove(host)
+
+        urls = [f"https://{host}.org/{i}" for host in ("a", "b") for i in range(6)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(check, urls))
+
+        assert peak == {"a.org": 2, "b.org": 2}
+
+    def test_delay_between_checks_on_a_host(self):
+        throttle = HostThrottle(concurrency=1, delay=0.05)
+        starts = []
+
+        for url in ("https://a.org/1", "https://b.org/1", "https://a.org/2"):
+            with throttle.limit(url):
+                starts.append(time.monotonic())
+
+        assert starts[1] - starts[0] < 0.05
+        assert starts[2] - starts[0] >= 0.05
@@ -0,0 +1,156 @@
+from unittest.mock import patch
+
+import pytest
+
+from udata.core.dataset.factories import DatasetFactory, HiddenDatasetFactory
+from udata.core.discussions.factories import DiscussionFactory
+from udata.core.metrics import bulk
+from udata.core.metrics.counters import metrics_queue, update_metrics
+from udata.core.organization.factories import OrganizationFactory
+from udata.core.organization.metrics import (
+    update_datasets_metrics,  # noqa needed to register signals
+)
+from udata.core.reuse.factories import ReuseFactory
+from udata.core.spatial.factories import GeoZoneFactory, SpatialCoverageFactory
+from udata.core.user.factories import UserFactory
+from udata.models import Dataset, Follow, GeoZone, Organization, Reuse, User
+
+from . import DBTestMixin, TestCase
+
+
+class BulkMetricsTest(DBTestMixin, TestCase):
+    def reset_metrics(self, *models):
+        for model in models:
+            model.objects.update(metrics={"views": 42})
+
+    def test_datasets_metrics(self):
+        user = UserFactory()
+        dataset = DatasetFactory()
+        other = DatasetFactory()
+        hidden = HiddenDatasetFactory()
+        ReuseFactory.create_batch(2, datasets=[dataset, other])
+        ReuseFactory(datasets=[dataset], private=True)
+        DiscussionFactory(subject=dataset, user=user)
+        Follow.objects.create(follower=user, following=dataset)
+        Follow.objects.create(follower=UserFactory(), following=dataset)
+        self.reset_metrics(Dataset)
+
+        assert bulk.update_datasets_metrics() == 2
+
+        dataset.reload()
+        assert dataset.metrics == {"views": 42, "discussions": 1, "reuses": 2, "followers": 2}
+        other.reload()
+        assert other.metrics == {"views": 42, "discussions": 0, "reuses": 2, "followers": 0}
+        hidden.reload()
+        assert hidden.metrics == {"views": 42}
+
+    def test_datasets_metrics_drop(self):
+        dataset = DatasetFactory()
+        self.reset_metrics(Dataset)
+
+        bulk.update_datasets_metrics(drop=True)
+
+        dataset.reload()
+        assert dataset.metrics == {"discussions": 0, "reuses": 0, "followers": 0}
+
+    def test_reuses_metrics(self):
+        reuse = ReuseFactory(datasets=[DatasetFactory()])
+        DiscussionFactory.create_batch(2, subject=reuse, user=UserFactory())
+        DiscussionFactory(subject=reuse, user=UserFactory(), closed=reuse.created_at)
+        Follow.objects.create(follower=UserFactory(), following=reuse)
+        self.reset_metrics(Reuse)
+
+        assert bulk.update_reuses_metrics() == 1
+
+        reuse.reload()
+        assert reuse.metrics == {"views": 42, "discussions": 2, "followers": 1}
+
+    def test_organizations_metrics(self):
+        org = OrganizationFactory(admins=[UserFactory()], editors=[UserFactory()])
+        DatasetFactory.create_batch(3, organization=org)
+        HiddenDatasetFactory(organization=org)
+        ReuseFactory(organization=org, datasets=[DatasetFactory()])
+        Follow.objects.create(follower=UserFactory(), following=org)
+        self.reset_metrics(Organization)
+
+        assert bulk.update_organizations_metrics() == 1
+
+        org.reload()
+        assert org.metrics == {
+            "views": 42,
+            "datasets": 3,
+            "reuses": 1,
+            "followers": 1,
+            "members": 2,
+        }
+
+    def test_users_metrics(self):
+        user = UserFactory()
+        other = UserFactory()
+        DatasetFactory.create_batch(2, owner=user)
+        ReuseFactory(owner=user, datasets=[DatasetFactory()])
+        Follow.objects.create(follower=other, following=user)
+        Follow.objects.create(follower=user, following=other)
+        Follow.objects.create(follower=user, following=DatasetFactory())
+        self.reset_metrics(User)
+
+        bulk.update_users_metrics()
+
+        user.reload()
+        assert user.metrics == {
+            "views": 42,
+            "datasets": 2,
+            "reuses": 1,
+            "followers": 1,
+            "following": 2,
+        }
+
+    def test_geozones_metrics(self):
+        zone = GeoZoneFactory()
+        DatasetFactory.create_batch(2, spatial=SpatialCoverageFactory(zones=[zone]))
+        self.reset_metrics(GeoZone)
+
+        assert bulk.update_geozones_metrics() == 1
+
+        zone.reload()
+        assert zone.metrics == {"views": 42, "datasets": 2}
+
+
+@pytest.mark.usefixtures("clean_db")
+class MetricsQueueTest:
+    @pytest.mark.options(METRICS_DEBOUNCE=60)
+    @patch("udata.core.metrics.counters.update_metrics.delay")
+    def test_coalesce_dirty_metrics(self, mock_delay):
+        org = OrganizationFactory()
+        DatasetFactory.create_batch(3, organization=org)
+
+        mock_delay.assert_not_called()
+        assert len(metrics_queue) == 1
+
+        metrics_queue.flush()
+
+        mock_delay.assert_called_once_with("Organization", "datasets", [str(org.id)])
+        assert len(metrics_queue) == 0
+
+    @pytest.mark.options(METRICS_DEBOUNCE=60, METRICS_BATCH_SIZE=2)
+    @patch("udata.core.metrics.counters.update_metrics.delay")
+    def test_flush_full_batch(self, mock_delay):
+        orgs = OrganizationFactory.create_batch(2)
+        for org in orgs:
+            DatasetFactory(organization=org)
+
+        mock_delay.assert_called_once_with(
+            "Organization", "datasets", sorted(str(org.id) for org in orgs)
+        )
+        assert len(metrics_queue) == 0
+
+    def test_update_metrics(self):
+        org = OrganizationFactory()
+        DatasetFactory.create_batch(2, organization=org)
+        HiddenDatasetFactory(organization=org)
+        Organization.objects(id=org.id).update(set__metrics={"views": 42})
+
+        update_metrics("Organization", "datasets", [str(org.id)])
+
+        org.reload()
+        assert org.metrics == {"views": 42, "datasets": 2}
@@ -4,6 +4,7 @@ from uuid import UUID, uuid4
 import pytest
 from mongoengine.errors import ValidationError
 from mongoengine.fields import BaseField
+from mongoengine.signals import pre_save
 
 from udata.errors import ConfigError
 from udata.i18n import _
@@ -217,6 +218,40 @@ class SlugFieldTest:
         assert len(last_obj.slug) == SlugTester.slug.max_length
         assert last_obj.slug.endswith("-10")
 
+    def test_populate_after_highest_index(self):
+        """SlugField should take the index suffix following the highest one taken, if needed"""
+        SlugTester.objects.create(title="title")
+        SlugTester.objects.create(slug="title-2")
+        SlugTester.objects.create(slug="title-other")
+
+        assert SlugTester.objects.create(title="title").slug == "title-3"
+        assert SlugTester.objects.create(title="title").slug == "title-4"
+
+        # A free slug is kept even if suffixed variants are taken
+        SlugTester.objects.create(title="budget 2024")
+        assert SlugTester.objects.create(title="budget").slug == "budget"
+        assert SlugTester.objects.create(title="budget").slug == "budget-2025"
+
+    def test_populate_again_on_collision(self):
+        """SlugField should be allocated again when a concurrent save took it"""
+        # Ensure slug population handler is connected first
+        SlugTester.objects.create(title="other")
+
+        def concurrent_save(sender, document, **kwargs):
+            pre_save.disconnect(concurrent_save, sender=SlugTester)
+            SlugTester._get_collection().insert_one(
+                {"_cls": "SlugTester", "title": "title", "slug": document.slug}
+            )
+
+        pre_save.connect(concurrent_save, sender=SlugTester)
+        try:
+            obj = SlugTester.objects.create(title="title")
+        finally:
+            pre_save.disconnect(concurrent_save, sender=SlugTester)
+
+        assert obj.slug == "title-1"
+        assert SlugTester.objects(slug="title").count() == 1
+
     def test_multiple_spaces(self):
         field = db.SlugField()
         assert field.slugify("a  b") == "a-b"
@@ -1,5 +1,10 @@
+import json
+
 import pytest
 from rdflib import (
+    BNode,
+    ConjunctiveGraph,
+    Graph,
     Literal,
     URIRef,
 )
@@ -7,12 +12,17 @@ from rdflib import (
 from udata.models import ContactPoint
 from udata.rdf import (
     ACCEPTED_MIME_TYPES,
+    CONTEXT,
+    DCAT,
+    DCT,
     FORMAT_MAP,
     RDF,
     VCARD,
     contact_point_to_rdf,
     guess_format,
+    namespace_manager,
     negociate_content,
+    stream_graphs,
     want_rdf,
 )
 from udata.tests import TestCase
@@ -95,3 +105,68 @@ class ContactToRdfTest:
         assert contact_rdf.value(VCARD.fn) == Literal("Organization contact")
         assert contact_rdf.value(VCARD.hasEmail).identifier == URIRef("mailto:hello@its.me")
         assert contact_rdf.value(VCARD.hasUrl).identifier == URIRef("https://data.support.com")
+
+
+class StreamGraphsTest:
+    CATALOG = URIRef("http://example.org/catalog")
+
+    def dataset_graph(self, index):
+        graph = Graph(namespace_manager=namespace_manager)
+        dataset = graph.resource(URIRef(f"http://example.org/datasets/{index}"))
+        dataset.set(RDF.type, DCAT.Dataset)
+        dataset.set(DCT.title, Literal(f"Dataset {index}"))
+        publisher = graph.resource(BNode())
+        publisher.set(DCT.title, Literal(f"Publisher {index}"))
+        dataset.set(DCT.publisher, publisher)
+        graph.resource(self.CATALOG).add(DCAT.dataset, dataset)
+        return graph
+
+    @pytest.mark.parametrize("fmt", ("nt", "ttl", "json"))
+    def test_concatenated_graphs_parse_as_one(self, fmt):
+        """Streamed graphs should parse like the merged graph serialized at once"""
+        graphs = [self.dataset_graph(index) for index in range(3)]
+        merged = Graph(namespace_manager=namespace_manager)
+        for graph in graphs:
+            merged += graph
+        rdf_format = guess_format(fmt)
+        kwargs = {"context": CONTEXT} if rdf_format == "json-ld" else {}
+        serialized = merged.serialize(format=rdf_format, **kwargs)
+        expected = Graph().parse(data=serialized, format=rdf_format)
+
+        data = "".join(stream_graphs(graphs, fmt))
+
+        parsed = ConjunctiveGraph().parse(data=data, format=rdf_format)
+        assert len(parsed) == len(expected)
+        assert len(list(parsed.objects(self.CATALOG, DCAT.dataset))) == 3
+        assert len(set(parsed.objects(predicate=DCT.publisher))) == 3
+
+    def test_json_ld_is_a_single_document(self):
+        graphs = [self.dataset_graph(index) for index in range(2)]
+
+        document = json.loads("".join(stream_graphs(graphs, "json")))
+
+        assert document["@context"] == CONTEXT
+        ids = [node["@id"] for node in document["@graph"]]
+        assert ids.count(str(self.CATALOG)) == 2
+        assert "http://example.org/datasets/1" in ids
+
+    def test_skip_empty_graphs(self):
+        graphs = [Graph(), self.dataset_graph(1), Graph()]
+
+        data = "".join(stream_graphs(graphs, "nt"))
+
+        assert len(Graph().parse(data=data, format="nt")) == len(graphs[1])
+
+    def test_stream_lazily(self):
+        def graphs():
+            yield self.dataset_graph(1)
+            raise AssertionError("Should not be consumed")
+
+        chunks = stream_graphs(graphs(), "nt")
+
+        assert "Dataset 1" in next(chunks)
+
+    @pytest.mark.parametrize("fmt", ("xml", "n3", "trig"))
+    def test_unsupported_format(self, fmt):
+        with pytest.raises(ValueError):
+            list(stream_graphs([self.dataset_graph(1)], fmt))
@@ -5,10 +5,12 @@ from bson import ObjectId
 from flask import url_for
 
 from udata import routing
+from udata.app import cache
 from udata.core.spatial.factories import GeoZoneFactory
 from udata.core.spatial.models import GeoZone
 from udata.mongo import db
 from udata.mongo.slug_fields import SlugFollow
+from udata.settings import Testing
 from udata.tests.helpers import assert200, assert404, assert_redirects
 
 
@@ -276,6 +278,44 @@ class SlugAsSLugFieldWithFollowTest(AsSlugMixin):
         assert SlugFollow.objects.count() == 0
 
 
+class SlugResolutionCacheSettings(Testing):
+    CACHE_TYPE = "flask_caching.backends.simple"
+
+
+class SlugAsSlugFieldCachedTest(SlugAsSlugFieldTest):
+    settings = SlugResolutionCacheSettings
+
+    def test_resolution_cached(self, client):
+        tester = self.model.objects.create(slug="slug")
+        assert200(client.get("/model/slug"))
+
+        assert cache.get(self.model.slug.cache_key("slug")) == tester.id
+
+    def test_resolution_dropped_on_slug_taken(self, client):
+        tester = self.model.objects.create(slug="slug")
+        assert200(client.get("/model/slug"))
+
+        tester.slug = "other"
+        tester.save()
+        new_tester = self.model.objects.create(slug="slug")
+
+        assert cache.get(self.model.slug.cache_key("slug")) is None
+        assert client.get("/model/slug").get_data(as_text=True) == str(new_tester.id)
+
+
+class SlugAsSLugFieldWithFollowCachedTest(SlugAsSLugFieldWithFollowTest):
+    settings = SlugResolutionCacheSettings
+
+    def test_redirect_resolution_cached(self, client):
+        tester = self.model.objects.create(slug="old")
+        tester.slug = "new"
+        tester.save().reload()
+        assert_redirects(client.get("/model/old"), "/model/new")
+
+        assert cache.get(self.model.slug.cache_key("old")) == tester.id
+        assert_redirects(client.get("/model/old"), "/model/new")
+
+
 @pytest.mark.usefixtures("clean_db")
 @pytest.mark.options(TERRITORY_DEFAULT_PREFIX="fr")  # Not implemented
 class TerritoryConverterTest:
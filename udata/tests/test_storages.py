@@ -1,3 +1,4 @@
+import hashlib
 from datetime import datetime, timedelta
 from io import BytesIO
 from os.path import basename
@@ -49,6 +50,14 @@ class StorageUtilsTest:
         expected = "CA975130"  # Output of cksfv
         assert utils.crc32(self.file) == expected
 
+    def test_copy(self):
+        sha1, md5 = hashlib.sha1(), hashlib.md5()
+        out = BytesIO()
+        assert utils.copy(self.file, out, sha1, md5) == 2 * (2**16)
+        assert out.getvalue() == b"a" * 2 * (2**16)
+        assert sha1.hexdigest() == "ce5653590804baa9369f72d483ed9eba72f04d29"
+        assert md5.hexdigest() == "81615449a98aaaad8dc179b3bec87f38"
+
     def test_mime(self):
         assert utils.mime("test.txt") == "text/plain"
         assert utils.mime("test") is None
@@ -169,7 +178,7 @@ class StorageUploadViewTest:
         assert "url" in response.json
         assert "size" in response.json
         assert response.json["size"] == parts
-        assert "sha1" in response.json
+        assert response.json["sha1"] == hashlib.sha1(b"aaaa").hexdigest()
         expected_filename = "test-with-spaces.txt"
         filename = response.json["filename"]
         assert filename.endswith(expected_filename)
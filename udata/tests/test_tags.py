@@ -66,6 +66,54 @@ class TagsTests:
             assert tag.counts["datasets"] == count
             assert tag.counts["reuses"] == count
 
+    def test_count_reconcile(self):
+        DatasetFactory(tags=["used"])
+        Tag.objects.update(counts={"datasets": 42}, total=42)
+        Tag.objects.create(name="unused", counts={"datasets": 3}, total=3)
+
+        count_tags.run()
+
+        used = Tag.objects.get(name="used")
+        assert used.counts == {"datasets": 1, "reuses": 0}
+        assert used.total == 1
+        unused = Tag.objects.get(name="unused")
+        assert unused.counts == {"datasets": 0, "reuses": 0}
+        assert unused.total == 0
+
+    def test_count_on_create(self):
+        DatasetFactory(tags=["tag-a", "tag-b"])
+        DatasetFactory(tags=["tag-a"])
+        ReuseFactory(tags=["tag-a"])
+
+        tag = Tag.objects.get(name="tag-a")
+        assert tag.counts == {"datasets": 2, "reuses": 1}
+        assert tag.total == 3
+        assert Tag.objects.get(name="tag-b").total == 1
+
+    def test_count_on_update(self):
+        dataset = DatasetFactory(tags=["tag-a", "tag-b"])
+
+        dataset.tags = ["tag-b", "Tag C"]
+        dataset.save()
+
+        assert Tag.objects.get(name="tag-a").counts["datasets"] == 0
+        assert Tag.objects.get(name="tag-b").counts["datasets"] == 1
+        assert Tag.objects.get(name="tag-c").counts["datasets"] == 1
+
+        dataset.title = "other"
+        dataset.save()
+
+        assert Tag.objects.get(name="tag-b").counts["datasets"] == 1
+
+    def test_count_on_delete(self):
+        reuse = ReuseFactory(tags=["tag-a"])
+
+        reuse.delete()
+
+        tag = Tag.objects.get(name="tag-a")
+        assert tag.counts["reuses"] == 0
+        assert tag.total == 0
+
 
 class TagsUtilsTest:
     def test_tags_list(self):
@@ -1,6 +1,9 @@
 from datetime import date, datetime
 
+import pytest
+
 from udata.utils import (
+    batched,
     daterange_end,
     daterange_start,
     get_by,
@@ -230,6 +233,24 @@ class RecursiveGetTest:
         assert recursive_get(tester, "") is None
 
 
+class BatchedTest:
+    def test_split_in_batches(self):
+        assert list(batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_consume_generators_lazily(self):
+        batches = batched((i for i in range(4)), 2)
+        assert next(batches) == [0, 1]
+        assert next(batches) == [2, 3]
+        assert list(batches) == []
+
+    def test_empty_iterable(self):
+        assert list(batched([], 3)) == []
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            list(batched([1], 0))
+
+
 class SafeUnicodeTest(object):
     def test_unicode_stays_unicode(self):
         assert safe_unicode("ééé") == "ééé"
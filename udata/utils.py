@@ -2,8 +2,9 @@ import hashlib
 import math
 import re
 from datetime import date, datetime
+from itertools import islice
 from math import ceil
-from typing import Any
+from typing import Any, Iterable, Iterator
 from uuid import UUID, uuid4
 from xml.sax.saxutils import escape
 
@@ -232,6 +233,15 @@ def hash_url(url: str) -> str | None:
     return hashlib.sha1(url.encode("utf-8")).hexdigest() if url else None
 
 
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of at most `size` items, lazily"""
+    if size < 1:
+        raise ValueError("Batch size should be at least 1")
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 def recursive_get(obj: Any, key: Any):
     """
     Get an attribute or a key recursively.